@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 19/10/2026 11:15 am
+# @Organisation: Veracode
+"""Throughput benchmarks for the API layer against the local mock API.
+
+Each scenario runs in a fresh process so its peak RSS is its own, drives
+the real command functions against ``mock_api.MockVeracodeApi`` and
+reports requests/s, p50/p95 request latency and peak RSS.
+
+  python benchmarks/bench_api.py --applications 10000 --users 10000
+"""
+
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+from queue import Empty
+
+import click
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_api import MockVeracodeApi  # noqa: E402
+
+# syntactically valid, never checked by the mock server
+MOCK_API_KEY_ID = '0' * 32
+MOCK_API_KEY_SECRET = '0' * 128
+
+SCENARIOS = ['list-applications', 'list-users-details', 'add-applications',
+             'add-users', 'delete-applications', 'delete-users']
+DISPLAY_BENCH_FMT = "{:22} {:>9} {:>9} {:>9} {:>9} {:>9} {:>12}"
+
+
+def _percentile(values, fraction):
+  if not values:
+    return 0.0
+  values = sorted(values)
+  return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _peak_rss_mb():
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_scenario(scenario, engine, settings_dict, items, queue):
+  from api_client import client_class
+  import application_commands
+  import user_commands
+  from application_commands import Application
+  from user_commands import User
+
+  sys.stdout = open(os.devnull, 'w')
+  client = client_class(engine)(MOCK_API_KEY_ID, MOCK_API_KEY_SECRET,
+                                settings_dict)
+
+  targets = []
+  if scenario == 'delete-applications':
+    targets = [application for application, _ in
+               zip(application_commands.fetch_applications(client),
+                   range(items))]
+  elif scenario == 'delete-users':
+    targets = [user for user, _ in
+               zip(user_commands.fetch_users(client), range(items))]
+
+  latencies = []
+  if engine == 'async':
+    send = client._send
+
+    async def timed_request(*args, **kwargs):
+      start = time.perf_counter()
+      try:
+        return await send(*args, **kwargs)
+      finally:
+        latencies.append(time.perf_counter() - start)
+
+    client._send = timed_request
+  else:
+    send = client.session.request
+
+    def timed_request(*args, **kwargs):
+      start = time.perf_counter()
+      try:
+        return send(*args, **kwargs)
+      finally:
+        latencies.append(time.perf_counter() - start)
+
+    client.session.request = timed_request
+  start = time.perf_counter()
+  if scenario == 'list-applications':
+    for _ in application_commands.fetch_applications(client):
+      pass
+  elif scenario == 'list-users-details':
+    for _ in user_commands.fetch_users(client, show_details=True):
+      pass
+  elif scenario == 'add-applications':
+    application_commands.add_applications_to_platform(
+      [Application(f'Benchmark Application {idx:05d}', '', None, '')
+       for idx in range(items)], client, preflight=False)
+  elif scenario == 'add-users':
+    user_commands.add_users_to_platform(
+      [User('Bench', f'User{idx:05d}', f'bench{idx:05d}@example.com',
+            f'bench{idx:05d}@example.com') for idx in range(items)],
+      client, preflight=False)
+  elif scenario == 'delete-applications':
+    application_commands.delete_applications(targets, client)
+  elif scenario == 'delete-users':
+    user_commands.delete_users(targets, client)
+  elapsed = time.perf_counter() - start
+
+  queue.put({
+    'scenario': scenario,
+    'requests': len(latencies),
+    'seconds': elapsed,
+    'requests_per_second': len(latencies) / elapsed if elapsed else 0.0,
+    'p50_ms': _percentile(latencies, 0.50) * 1000,
+    'p95_ms': _percentile(latencies, 0.95) * 1000,
+    'peak_rss_mb': _peak_rss_mb(),
+    'retries': client.retries,
+  })
+  client.close()
+
+
+def run_scenario(scenario, engine, settings_dict, items):
+  """Result of ``scenario`` run in a fresh process, or None if it died."""
+  context = multiprocessing.get_context('spawn')
+  queue = context.Queue()
+  process = context.Process(target=_run_scenario,
+                            args=(scenario, engine, settings_dict, items,
+                                  queue))
+  process.start()
+  while True:
+    try:
+      result = queue.get(timeout=1)
+      break
+    except Empty:
+      if process.is_alive():
+        continue
+    # exited: take a result it may have flushed just before, if any
+    try:
+      result = queue.get(timeout=1)
+    except Empty:
+      result = None
+    break
+  process.join()
+  return result
+
+
+@click.command()
+@click.option('-s', '--scenario', 'scenarios', multiple=True,
+              type=click.Choice(SCENARIOS),
+              help='Scenario to run (repeatable, default: all)')
+@click.option('--applications', default=10000, show_default=True,
+              help='Applications in the mock dataset')
+@click.option('--users', default=10000, show_default=True,
+              help='Users in the mock dataset')
+@click.option('--items', default=500, show_default=True,
+              help='Items created/deleted by the add and delete scenarios')
+@click.option('--latency', default=20.0, show_default=True,
+              help='Mock server latency per request in milliseconds')
+@click.option('--max-page-size', default=500, show_default=True)
+@click.option('--rate-429', default=0.0, show_default=True,
+              help='Fraction of requests the mock answers with 429')
+@click.option('--concurrency', type=int, help='Client concurrency setting')
+@click.option('--page-size', type=int, help='Client page_size setting')
+@click.option('--rate-limit', type=float, default=1000.0, show_default=True,
+              help='Client rate_limit setting (requests/s)')
+@click.option('--engine', type=click.Choice(['threads', 'async']),
+              default='threads', show_default=True,
+              help='Client engine to benchmark')
+@click.option('--output-json', type=click.Path(dir_okay=False),
+              help='Also write the results to this JSON file')
+def main(scenarios, applications, users, items, latency, max_page_size,
+         rate_429, concurrency, page_size, rate_limit, engine, output_json):
+  """Benchmark the Veracode API layer against a local mock server"""
+  server = MockVeracodeApi(applications=applications, users=users,
+                           latency=latency / 1000,
+                           max_page_size=max_page_size, rate_429=rate_429,
+                           retry_after=0.2).start()
+  settings_dict = server.settings()
+  settings_dict['rate_limit'] = rate_limit
+  if concurrency:
+    settings_dict['concurrency'] = concurrency
+  if page_size:
+    settings_dict['page_size'] = page_size
+
+  click.echo(DISPLAY_BENCH_FMT.format('Scenario', 'Requests', 'Seconds',
+                                      'Req/s', 'p50 ms', 'p95 ms',
+                                      'Peak RSS MB'))
+  click.echo(DISPLAY_BENCH_FMT.format('-' * 22, '-' * 9, '-' * 9, '-' * 9,
+                                      '-' * 9, '-' * 9, '-' * 12))
+  results, failed = [], []
+  for scenario in scenarios or SCENARIOS:
+    result = run_scenario(scenario, engine, settings_dict, items)
+    if result is None:
+      click.secho(f'{scenario:22} failed, see the traceback above',
+                  fg='red')
+      failed.append(scenario)
+      continue
+    results.append(result)
+    click.echo(DISPLAY_BENCH_FMT.format(
+      scenario, result['requests'], f"{result['seconds']:.2f}",
+      f"{result['requests_per_second']:.1f}", f"{result['p50_ms']:.1f}",
+      f"{result['p95_ms']:.1f}", f"{result['peak_rss_mb']:.1f}"))
+  server.shutdown()
+
+  if output_json:
+    with open(output_json, 'w') as fp:
+      json.dump(results, fp, indent=4)
+  if failed:
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
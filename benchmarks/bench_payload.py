@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 22/10/2026 3:05 pm
+# @Organisation: Veracode
+"""Microbenchmark for record construction and request payload building.
+
+Compares building creation payloads with ``copy.deepcopy`` of the input
+template plus ``json.dumps`` (how payloads used to be built) against the
+pre-serialized ``PayloadTemplate``, and the memory of N records with and
+without ``__slots__``. No network involved.
+
+  python benchmarks/bench_payload.py --items 50000
+"""
+
+import copy
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import click
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from constant import USER_CREATION_INPUT, \
+  APPLICATION_CREATION_INPUT  # noqa: E402
+from application_commands import Application  # noqa: E402
+from user_commands import User  # noqa: E402
+
+DISPLAY_PAYLOAD_FMT = "{:28} {:>12} {:>12} {:>9}"
+
+
+class DictUser:
+  """A User without __slots__, as records used to be."""
+
+  def __init__(self, first_name, last_name, email, username, user_id=None,
+               saml=None, enabled=None, last_login=None):
+    self.first_name = first_name
+    self.last_name = last_name
+    self.email = email
+    self.username = username
+    self.user_id = '' if not user_id else user_id
+    self.saml = False if not saml else saml
+    self.enabled = True if not enabled else enabled
+    self.last_login = None if not last_login else last_login
+
+
+def deepcopy_user_json(user):
+  user_dict = copy.deepcopy(USER_CREATION_INPUT)
+  user_dict['first_name'] = user.first_name
+  user_dict['last_name'] = user.last_name
+  user_dict['email_address'] = user.email
+  user_dict['user_name'] = user.username
+  return json.dumps(user_dict)
+
+
+def deepcopy_application_json(application):
+  application_dict = copy.deepcopy(APPLICATION_CREATION_INPUT)
+  application_dict['profile']['name'] = application.application_name
+  application_dict['profile']['description'] = application.application_name
+  return json.dumps(application_dict)
+
+
+def _time_per_item(build, items):
+  start = time.perf_counter()
+  for item in items:
+    build(item)
+  return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def _memory_mb(make, count):
+  tracemalloc.start()
+  records = [make(idx) for idx in range(count)]
+  size = tracemalloc.get_traced_memory()[0]
+  tracemalloc.stop()
+  del records
+  return size / (1024 * 1024)
+
+
+@click.command()
+@click.option('--items', default=50000, show_default=True,
+              help='Number of records per measurement')
+def main(items):
+  """Compare payload building and record memory, old versus new"""
+  users = [User(f'First{idx}', f'Last{idx}', f'pov.user{idx}@example.com',
+                f'pov.user{idx}@example.com') for idx in range(items)]
+  applications = [Application(f'PoV Application {idx:05d}', '', None, '')
+                  for idx in range(items)]
+  assert users[0].get_user_json() == deepcopy_user_json(users[0])
+  assert applications[0].get_application_json() == \
+         deepcopy_application_json(applications[0])
+
+  click.echo(DISPLAY_PAYLOAD_FMT.format('Measurement', 'Before', 'After',
+                                        'Gain'))
+  click.echo(DISPLAY_PAYLOAD_FMT.format('-' * 28, '-' * 12, '-' * 12,
+                                        '-' * 9))
+  for label, before, after in [
+    ('User payload (us/item)',
+     _time_per_item(deepcopy_user_json, users),
+     _time_per_item(User.get_user_json, users)),
+    ('Application payload (us/item)',
+     _time_per_item(deepcopy_application_json, applications),
+     _time_per_item(Application.get_application_json, applications)),
+    (f'{items} users (MB)',
+     _memory_mb(lambda idx: DictUser('', '', f'u{idx}@example.com',
+                                     f'u{idx}@example.com', str(idx)), items),
+     _memory_mb(lambda idx: User('', '', f'u{idx}@example.com',
+                                 f'u{idx}@example.com', str(idx)), items)),
+  ]:
+    click.echo(DISPLAY_PAYLOAD_FMT.format(label, f'{before:.2f}',
+                                          f'{after:.2f}',
+                                          f'{before / after:.1f}x'))
+
+
+if __name__ == '__main__':
+  main()
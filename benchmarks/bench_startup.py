@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 20/10/2026 10:45 am
+# @Organisation: Veracode
+"""CLI startup budget check based on ``python -X importtime``.
+
+Runs offline commands in a throwaway HOME, sums the import time they add
+on top of a bare interpreter and fails if it exceeds the budget or if any
+of the heavy, network/Excel-only modules got imported.
+
+  python benchmarks/bench_startup.py --budget-ms 40
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+OFFLINE_COMMANDS = [['credentials', 'list'], ['credentials', '--help']]
+HEAVY_MODULES = ['requests', 'veracode_api_signing', 'openpyxl']
+DISPLAY_STARTUP_FMT = "{:24} {:>12} {:>12} {:>8}"
+
+
+def _import_profile(code, home):
+  """Run ``code`` with -X importtime; return (total µs, imported modules)."""
+  env = dict(os.environ, HOME=home, USERPROFILE=home)
+  completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                             cwd=SRC, env=env, stdin=subprocess.DEVNULL,
+                             stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE, text=True, check=True)
+  total, modules = 0, set()
+  for line in completed.stderr.splitlines():
+    if not line.startswith('import time:') or 'cumulative' in line:
+      continue
+    _, cumulative, name = line[len('import time:'):].split('|')
+    modules.add(name.strip())
+    if not name[1:].startswith(' '):  # top-level import
+      total += int(cumulative)
+  return total, modules
+
+
+def _command_code(args):
+  return f"import sys, pov; sys.argv = ['pov'] + {args!r}; " \
+         f"pov.main(standalone_mode=False)"
+
+
+@click.command()
+@click.option('--budget-ms', default=40.0, show_default=True,
+              help='Maximum import time an offline command may add')
+@click.option('--runs', default=5, show_default=True,
+              help='Runs per command; the median is reported')
+def main(budget_ms, runs):
+  """Check that offline pov commands start within the import budget"""
+  failed = False
+  with tempfile.TemporaryDirectory() as home:
+    baseline = statistics.median(
+      _import_profile('pass', home)[0] for _ in range(runs))
+    click.echo(DISPLAY_STARTUP_FMT.format('Command', 'Imports ms',
+                                          'Wall ms', 'Budget'))
+    click.echo(DISPLAY_STARTUP_FMT.format('-' * 24, '-' * 12, '-' * 12,
+                                          '-' * 8))
+    for args in OFFLINE_COMMANDS:
+      totals, walls, modules = [], [], set()
+      for _ in range(runs):
+        start = time.perf_counter()
+        total, modules = _import_profile(_command_code(args), home)
+        walls.append(time.perf_counter() - start)
+        totals.append(total)
+      import_ms = (statistics.median(totals) - baseline) / 1000
+      heavy = [module for module in HEAVY_MODULES if module in modules]
+      within_budget = import_ms <= budget_ms and not heavy
+      failed |= not within_budget
+      click.echo(DISPLAY_STARTUP_FMT.format(
+        'pov ' + ' '.join(args), f'{import_ms:.1f}',
+        f'{statistics.median(walls) * 1000:.1f}',
+        'ok' if within_budget else 'FAIL'))
+      if heavy:
+        click.secho(f'  imports {", ".join(heavy)} eagerly', fg='red')
+  sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+  main()
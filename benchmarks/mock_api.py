@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 19/10/2026 9:40 am
+# @Organisation: Veracode
+"""Local stand-in for the Veracode Applications and Identity APIs.
+
+Serves HAL payloads shaped like the real ``/appsec/v1/applications`` and
+``/api/authn/v2/users`` endpoints from an in-memory dataset, with
+configurable latency, page size cap and 429 injection. Authentication
+headers are accepted but not verified.
+
+  python benchmarks/mock_api.py --applications 10000 --users 10000 \\
+    --latency 50 --rate-429 0.01
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+
+import click
+
+APPLICATIONS_PATH = '/appsec/v1/applications'
+USERS_PATH = '/api/authn/v2/users'
+USER_SEARCH_PATH = USERS_PATH + '/search'
+POLICIES_PATH = '/appsec/v1/policies'
+TEAMS_PATH = '/api/authn/v2/teams'
+POLICIES = [
+  ('4cbdbf17-7979-4848-bd7f-f5c0e1b67d18', 'Veracode Recommended High + SCA'),
+  ('9ab6dc22-c3f7-4d68-9c6e-2a9e2b3b1f0c', 'Veracode Recommended Medium'),
+  ('1d0f4f4c-8ac1-4bd1-a3a5-6f9b5c4e7f21', 'Veracode Transitional Very High'),
+]
+TEAMS = [
+  ('8f0c1d5e-3c55-4a4b-9d0e-5b7e6c1f2a01', 'PoV Team'),
+  ('2b6e9a44-7d1f-4e8a-a3c2-9f4d8e7b6c02', 'Security Champions'),
+]
+ROLES = ['greenlightideuser', 'sandboxadmin', 'workSpaceEditor', 'extsubmitter',
+         'extreviewer', 'extcreator', 'extseclead', 'securityinsightsonly']
+
+
+def _timestamp(dt):
+  return dt.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class MockDataset:
+  """In-memory applications and users, keyed by GUID/user id."""
+
+  def __init__(self, applications=1000, users=1000, seed=0):
+    self.random = random.Random(seed)
+    self.lock = threading.Lock()
+    self.applications = {}
+    self.users = {}
+    for idx in range(applications):
+      self.add_application({'name': f'PoV Application {idx:05d}',
+                            'description': f'PoV Application {idx:05d}',
+                            'business_criticality': 'VERY_HIGH'})
+    for idx in range(users):
+      self.add_user({'email_address': f'pov.user{idx:05d}@example.com',
+                     'user_name': f'pov.user{idx:05d}@example.com',
+                     'first_name': f'First{idx:05d}',
+                     'last_name': f'Last{idx:05d}',
+                     'roles': [{'role_name': role} for role in
+                               self.random.sample(ROLES, 3)]})
+
+  def _now(self):
+    return datetime.now(timezone.utc)
+
+  def add_application(self, profile):
+    guid = str(uuid.UUID(int=self.random.getrandbits(128)))
+    policy_guid, policy_name = self.random.choice(POLICIES)
+    created = self._now() - timedelta(days=self.random.randint(1, 900))
+    scanned = None if self.random.random() < 0.3 else \
+      _timestamp(created + timedelta(days=self.random.randint(0, 30)))
+    application = {
+      'guid': guid,
+      'id': self.random.randint(100000, 999999),
+      'oid': self.random.randint(100000, 999999),
+      'alt_org_id': self.random.randint(10000, 99999),
+      'organization_id': 12345,
+      'created': _timestamp(created),
+      'modified': _timestamp(created + timedelta(days=1)),
+      'last_completed_scan_date': scanned,
+      'last_policy_compliance_check_date': scanned,
+      'app_profile_url': f'HomeAppProfile:12345:{guid}',
+      'results_url': f'ViewReportsResultSummary:12345:{guid}',
+      'scans': [],
+      'profile': {
+        'name': profile['name'],
+        'description': profile.get('description', ''),
+        'business_criticality': profile.get('business_criticality',
+                                            'VERY_HIGH'),
+        'tags': '',
+        'teams': [],
+        'custom_fields': None,
+        'settings': {'nextday_consultation_allowed': False,
+                     'static_scan_dependencies_allowed': False,
+                     'dynamic_scan_approval_not_required': False,
+                     'sca_enabled': True},
+        'policies': [{'guid': policy_guid,
+                      'name': policy_name,
+                      'is_default': True,
+                      'policy_compliance_status': 'NOT_ASSESSED'}],
+        'business_unit': {'id': 1, 'name': 'Not Specified',
+                          'guid': str(uuid.UUID(int=0))},
+        'business_owners': [],
+        'archer_app_name': None,
+      },
+      '_links': {'self': {'href': f'{APPLICATIONS_PATH}/{guid}'}},
+    }
+    with self.lock:
+      self.applications[guid] = application
+    return application
+
+  def complete_scan(self, guid):
+    """Simulate a scan of ``guid`` finishing now."""
+    with self.lock:
+      application = self.applications[guid]
+      application['last_completed_scan_date'] = _timestamp(self._now())
+      application['modified'] = application['last_completed_scan_date']
+    return application
+
+  def add_user(self, body):
+    user_id = str(uuid.UUID(int=self.random.getrandbits(128)))
+    last_login = None if self.random.random() < 0.2 else \
+      (self._now() - timedelta(days=self.random.randint(0, 90))) \
+        .strftime('%Y-%m-%d')
+    user = {
+      'user_id': user_id,
+      'user_legacy_id': self.random.randint(100000, 999999),
+      'user_name': body.get('user_name', body['email_address']),
+      'email_address': body['email_address'],
+      'first_name': body.get('first_name', ''),
+      'last_name': body.get('last_name', ''),
+      'saml_user': False,
+      'login_enabled': True,
+      'active': body.get('active', True),
+      'ip_restricted': body.get('ipRestricted', False),
+      'last_login': last_login,
+      'roles': body.get('roles', []),
+      'teams': body.get('teams', []),
+      'permissions': [],
+      '_links': {'self': {'href': f'{USERS_PATH}/{user_id}'}},
+    }
+    with self.lock:
+      self.users[user_id] = user
+    return user
+
+  @staticmethod
+  def user_summary(user):
+    return {key: user[key] for key in
+            ('user_id', 'user_legacy_id', 'user_name', 'email_address',
+             'saml_user', 'login_enabled', '_links')}
+
+
+def _application_matches(application, query):
+  """The Applications API filters: name, policy and modified_after."""
+  profile = application['profile']
+  if 'name' in query and \
+          query['name'][0].lower() not in profile['name'].lower():
+    return False
+  if 'policy' in query and query['policy'][0].lower() not in \
+          [policy['name'].lower() for policy in profile['policies']]:
+    return False
+  return 'modified_after' not in query or \
+         application['modified'][:10] >= query['modified_after'][0]
+
+
+def _user_matches(user, query):
+  """The user search filters: search_term, saml_user, login_enabled."""
+  if 'search_term' in query:
+    term = query['search_term'][0].lower()
+    if not any(term in (user.get(key) or '').lower() for key in
+               ('user_name', 'email_address', 'first_name', 'last_name')):
+      return False
+  for key in ('saml_user', 'login_enabled'):
+    if key in query and \
+            str(bool(user.get(key))).lower() != query[key][0].lower():
+      return False
+  return True
+
+
+class MockApiHandler(BaseHTTPRequestHandler):
+  protocol_version = 'HTTP/1.1'
+  server_version = 'MockVeracodeApi/1.0'
+  disable_nagle_algorithm = True
+
+  def log_message(self, format, *args):
+    pass
+
+  @property
+  def options(self):
+    return self.server.options
+
+  def _send(self, status, body=None, headers=None):
+    payload = b'' if body is None else json.dumps(body).encode()
+    self.send_response(status)
+    self.send_header('Content-Type', 'application/hal+json')
+    self.send_header('Content-Length', str(len(payload)))
+    for name, value in (headers or {}).items():
+      self.send_header(name, value)
+    self.end_headers()
+    self.wfile.write(payload)
+
+  def _read_body(self):
+    length = int(self.headers.get('Content-Length') or 0)
+    return json.loads(self.rfile.read(length) or b'{}')
+
+  def _intercept(self):
+    """Apply latency and 429 injection; return True if the request ended."""
+    with self.server.counter_lock:
+      self.server.request_count += 1
+    if self.options['latency']:
+      time.sleep(self.options['latency'])
+    if self.options['rate_429'] and \
+            random.random() < self.options['rate_429']:
+      self._read_body()
+      self._send(429, {'message': 'Too Many Requests'},
+                 {'Retry-After': str(self.options['retry_after'])})
+      return True
+    return False
+
+  def _page(self, records, embedded_key, path, query):
+    size = min(int(query.get('size', ['50'])[0]),
+               self.options['max_page_size'])
+    number = int(query.get('page', ['0'])[0])
+    total_pages = max(1, -(-len(records) // size))
+    body = {
+      '_embedded': {embedded_key: records[number * size:(number + 1) * size]},
+      'page': {'size': size, 'number': number,
+               'total_elements': len(records), 'total_pages': total_pages},
+      '_links': {'self': {'href': self.path}},
+    }
+    if number + 1 < total_pages:
+      params = {k: v[0] for k, v in query.items() if k != 'page'}
+      params['page'] = number + 1
+      query_string = urlencode(params)
+      body['_links']['next'] = {
+        'href': f'http://{self.headers["Host"]}{path}?{query_string}'}
+    return body
+
+  def _send_page(self, records, embedded_key, path, query):
+    """Send one listing page with an ETag of that page's content, as the
+    real API does: it only vouches for the page it came with."""
+    body = self._page(records, embedded_key, path, query)
+    etag = 'W/"%s"' % hashlib.md5(json.dumps(
+      [body['_embedded'], body['page']], sort_keys=True).encode()).hexdigest()
+    if self.headers.get('If-None-Match') == etag:
+      return self._send(304, headers={'ETag': etag})
+    self._send(200, body, {'ETag': etag})
+
+  def do_GET(self):
+    if self._intercept():
+      return
+    url = urlparse(self.path)
+    query = parse_qs(url.query)
+    dataset = self.server.dataset
+    if url.path == APPLICATIONS_PATH:
+      records = [application for application in dataset.applications.values()
+                 if _application_matches(application, query)]
+      return self._send_page(records, 'applications', url.path, query)
+    if url.path == TEAMS_PATH:
+      records = [{'team_id': team_id, 'team_name': name}
+                 for team_id, name in TEAMS]
+      return self._send_page(records, 'teams', url.path, query)
+    if url.path == POLICIES_PATH:
+      records = [{'guid': guid, 'name': name, 'version': 1, 'type': 'STANDARD'}
+                 for guid, name in POLICIES]
+      return self._send_page(records, 'policy_versions', url.path, query)
+    if url.path in (USERS_PATH, USER_SEARCH_PATH):
+      detailed = query.get('detailed', ['false'])[0] == 'true'
+      records = [user if detailed else dataset.user_summary(user)
+                 for user in dataset.users.values()
+                 if url.path == USERS_PATH or _user_matches(user, query)]
+      return self._send_page(records, 'users', url.path, query)
+    match = re.fullmatch(APPLICATIONS_PATH + r'/([\w-]+)', url.path)
+    if match and match.group(1) in dataset.applications:
+      return self._send(200, dataset.applications[match.group(1)])
+    match = re.fullmatch(USERS_PATH + r'/([\w-]+)', url.path)
+    if match and match.group(1) == 'self':
+      return self._send(200, {'user_id': 'api-user', 'user_name': 'api'})
+    if match and match.group(1) in dataset.users:
+      return self._send(200, dataset.users[match.group(1)])
+    self._send(404, {'message': 'Not Found'})
+
+  def do_POST(self):
+    if self._intercept():
+      return
+    url = urlparse(self.path)
+    body = self._read_body()
+    dataset = self.server.dataset
+    if url.path == APPLICATIONS_PATH:
+      name = body['profile']['name'].lower()
+      if any(application['profile']['name'].lower() == name
+             for application in list(dataset.applications.values())):
+        return self._send(409, {'message': 'Application already exists'})
+      return self._send(200, dataset.add_application(body['profile']))
+    if url.path == USERS_PATH:
+      return self._send(200, dataset.add_user(body))
+    self._send(404, {'message': 'Not Found'})
+
+  def do_PUT(self):
+    if self._intercept():
+      return
+    url = urlparse(self.path)
+    body = self._read_body()
+    match = re.fullmatch(USERS_PATH + r'/([\w-]+)', url.path)
+    dataset = self.server.dataset
+    if match and match.group(1) in dataset.users:
+      team_names = dict(TEAMS)
+      for team in body.get('teams', []):
+        team['team_name'] = team_names.get(team['team_id'], '')
+      with dataset.lock:
+        user = dataset.users[match.group(1)]
+        user.update(body)
+        if 'active' in body:
+          user['login_enabled'] = body['active']
+      return self._send(200, user)
+    self._send(404, {'message': 'Not Found'})
+
+  def do_DELETE(self):
+    if self._intercept():
+      return
+    url = urlparse(self.path)
+    dataset = self.server.dataset
+    for path, records in ((APPLICATIONS_PATH, dataset.applications),
+                          (USERS_PATH, dataset.users)):
+      match = re.fullmatch(path + r'/([\w-]+)', url.path)
+      if match and match.group(1) in records:
+        with dataset.lock:
+          del records[match.group(1)]
+        return self._send(204)
+    self._send(404, {'message': 'Not Found'})
+
+
+class MockVeracodeApi(ThreadingHTTPServer):
+  daemon_threads = True
+  # clients open a whole pool of connections at once; the default backlog
+  # of 5 drops SYNs and adds a 1s retransmit to the unlucky ones
+  request_queue_size = 128
+
+  def __init__(self, host='127.0.0.1', port=0, applications=1000, users=1000,
+               latency=0.0, max_page_size=500, rate_429=0.0, retry_after=1):
+    super().__init__((host, port), MockApiHandler)
+    self.dataset = MockDataset(applications, users)
+    self.options = {'latency': latency, 'max_page_size': max_page_size,
+                    'rate_429': rate_429, 'retry_after': retry_after}
+    self.request_count = 0
+    self.counter_lock = threading.Lock()
+
+  @property
+  def base_url(self):
+    host, port = self.server_address[:2]
+    return f'http://{host}:{port}'
+
+  def settings(self):
+    """settings.json style dict pointing the CLI at this server."""
+    return {'activated_credentials': 'mock',
+            'api_base': self.base_url + '/appsec/v1',
+            'admin_base': self.base_url + '/api/authn/v2',
+            'headers': {'User-Agent': 'Python HMAC'}}
+
+  def start(self):
+    thread = threading.Thread(target=self.serve_forever, daemon=True)
+    thread.start()
+    return self
+
+
+@click.command()
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=8080, show_default=True)
+@click.option('--applications', default=10000, show_default=True,
+              help='Number of applications in the dataset')
+@click.option('--users', default=10000, show_default=True,
+              help='Number of users in the dataset')
+@click.option('--latency', default=50.0, show_default=True,
+              help='Added latency per request in milliseconds')
+@click.option('--max-page-size', default=500, show_default=True)
+@click.option('--rate-429', default=0.0, show_default=True,
+              help='Fraction of requests answered with 429')
+@click.option('--retry-after', default=1, show_default=True,
+              help='Retry-After seconds sent with injected 429s')
+def main(host, port, applications, users, latency, max_page_size, rate_429,
+         retry_after):
+  """Run the mock Veracode API until interrupted"""
+  server = MockVeracodeApi(host, port, applications, users, latency / 1000,
+                           max_page_size, rate_429, retry_after)
+  click.echo(f'Serving mock Veracode API on {server.base_url}')
+  click.echo(json.dumps(server.settings(), indent=4))
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 18/10/2026 9:12 am
+# @Organisation: Veracode
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+import click
+import requests
+from requests.adapters import HTTPAdapter
+from veracode_api_signing.plugin_requests import RequestsAuthPluginVeracodeHMAC
+
+from cache import ListingCache
+from stats import RequestStats
+from credentials_commands import activate_credentials
+from constant import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, DEFAULT_CONCURRENCY, \
+  DEFAULT_PAGE_SIZE, DEFAULT_CACHE_TTL, DEFAULT_RATE_LIMIT, DEFAULT_MAX_RETRIES
+from throttle import AdaptiveRateLimiter, RetryPolicy, retry_after
+
+JSON_HEADERS = {'Content-Type': 'application/json',
+                'Accept': 'application/json'}
+
+
+class VeracodeApiClient:
+  """Pooled, HMAC-signed HTTP client shared by every Veracode API call.
+
+  One keep-alive ``requests.Session`` is reused for the whole command so
+  connections (and their TLS handshakes) are paid for once per host instead
+  of once per request. Every attempt is recorded in ``stats``, which may be
+  shared between clients.
+  """
+
+  def __init__(self, api_id, api_key, settings_dict, profile=None,
+               stats=None):
+    self.profile = profile
+    self.stats = stats or RequestStats()
+    self.api_base = settings_dict['api_base']
+    self.admin_base = settings_dict['admin_base']
+    self.pool_size = settings_dict.get('pool_size', DEFAULT_POOL_SIZE)
+    self.timeout = settings_dict.get('timeout', DEFAULT_TIMEOUT)
+    self.concurrency = settings_dict.get('concurrency', DEFAULT_CONCURRENCY)
+    self.page_size = settings_dict.get('page_size', DEFAULT_PAGE_SIZE)
+    self.cache = None if profile is None else \
+      ListingCache(profile, settings_dict.get('cache_ttl', DEFAULT_CACHE_TTL))
+    self.rate_limiter = AdaptiveRateLimiter(
+      settings_dict.get('rate_limit', DEFAULT_RATE_LIMIT))
+    self.retry_policy = RetryPolicy(
+      settings_dict.get('max_retries', DEFAULT_MAX_RETRIES))
+    self.retries = 0
+    self.throttle_time = 0.0
+    self._stats_lock = threading.Lock()
+
+    self._open_session(api_id, api_key, settings_dict['headers'])
+
+  def _open_session(self, api_id, api_key, headers):
+    self.session = requests.Session()
+    self.session.auth = RequestsAuthPluginVeracodeHMAC(api_key_id=api_id,
+                                                       api_key_secret=api_key)
+    self.session.headers.update(headers)
+    self._mount_adapter(self.pool_size)
+
+  @classmethod
+  def from_profile(cls, config, settings_dict, profile=None, stats=None):
+    profile = profile or settings_dict['activated_credentials']
+    return cls(config[profile]['veracode_api_key_id'],
+               config[profile]['veracode_api_key_secret'],
+               settings_dict,
+               profile=profile,
+               stats=stats)
+
+  def api_url(self, path):
+    return self.api_base + path
+
+  def admin_url(self, path):
+    return self.admin_base + path
+
+  def request(self, method, url, **kwargs):
+    """Send a request through the rate limiter, retrying transient errors.
+
+    A 429 slows the shared rate limiter down and pauses every thread for
+    the server's Retry-After; other retryable failures back off with
+    jitter. See RetryPolicy for which failures are retried.
+    """
+    kwargs.setdefault('timeout', self.timeout)
+    attempt = 0
+    while True:
+      waited = self.rate_limiter.acquire()
+      started = time.perf_counter()
+      try:
+        response = self.session.request(method, url, **kwargs)
+      except (requests.ConnectionError, requests.Timeout):
+        self.stats.record(method, url, time.perf_counter() - started)
+        delay = self._retry_delay(method, attempt)
+        if delay is None:
+          raise
+      else:
+        self.stats.record(method, url, time.perf_counter() - started,
+                          response.status_code,
+                          payload_size(kwargs.get('data')),
+                          len(response.content))
+        delay = self._retry_delay(method, attempt, response)
+        if delay is None:
+          self._record_wait(waited)
+          return response
+      self._record_wait(waited + delay, retried=True)
+      self.stats.record_retry(method, url)
+      time.sleep(delay)
+      attempt += 1
+
+  def _retry_delay(self, method, attempt, response=None):
+    """Seconds to wait before retrying, or None if the outcome is final.
+
+    ``response`` is None when the request failed to connect or timed out.
+    """
+    if response is None:
+      if not self.retry_policy.should_retry(method, attempt):
+        return None
+      return self.retry_policy.backoff(attempt)
+    throttled = response.status_code == 429
+    if throttled:
+      self.rate_limiter.on_throttled(
+        retry_after(response) or self.retry_policy.backoff(attempt))
+    elif response.ok:
+      self.rate_limiter.on_success()
+    if not self.retry_policy.should_retry(method, attempt, response):
+      return None
+    # after a 429 the rate limiter pause does the waiting
+    return 0 if throttled else self.retry_policy.backoff(attempt)
+
+  def _record_wait(self, seconds, retried=False):
+    with self._stats_lock:
+      self.throttle_time += seconds
+      self.retries += retried
+
+  def get(self, url, **kwargs):
+    return self.request('GET', url, **kwargs)
+
+  def post(self, url, **kwargs):
+    return self.request('POST', url, **kwargs)
+
+  def put(self, url, **kwargs):
+    return self.request('PUT', url, **kwargs)
+
+  def delete(self, url, **kwargs):
+    return self.request('DELETE', url, **kwargs)
+
+  def iter_pages(self, url, embedded_key, params=None, page_size=None,
+                 validators=None):
+    """Yield every embedded record of a paged HAL listing.
+
+    Follows ``_links.next`` (falling back to the ``page`` metadata) and
+    fetches the next page in the background while the caller consumes the
+    current one. A ``validators`` list gets one entry per page fetched
+    (its request, ETag, Last-Modified and record count), for
+    ``revalidate_pages``. Raises ApiError on a non-2xx page.
+    """
+    yield from self._crawl((url, self._page_params(params, page_size)),
+                           embedded_key, validators)
+
+  def _crawl(self, page_request, embedded_key, validators=None,
+             response=None):
+    """iter_pages from ``page_request``, whose ``response`` may already be
+    at hand."""
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+      if response is None:
+        response = self._get_page(*page_request)
+      while response is not None:
+        data = response.json()
+        next_request = _next_page(data, *page_request)
+        future = None if next_request is None else \
+          prefetcher.submit(self._get_page, *next_request)
+        records = data.get('_embedded', {}).get(embedded_key, [])
+        if validators is not None:
+          validators.append({
+            'url': page_request[0], 'params': page_request[1],
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'count': len(records)})
+        yield from records
+        page_request = next_request
+        response = None if future is None else future.result()
+
+  def revalidate_pages(self, validators):
+    """Request every page of ``validators`` again, conditionally, in order.
+
+    Yields ``(validator, response)`` and stops after the first page that
+    does not answer 304. A validator only vouches for its own page, so a
+    listing is unchanged only when every page still matches.
+    """
+    for validator in validators:
+      headers = {}
+      if validator['etag']:
+        headers['If-None-Match'] = validator['etag']
+      if validator['last_modified']:
+        headers['If-Modified-Since'] = validator['last_modified']
+      response = self.get(validator['url'], params=validator['params'],
+                          headers=headers)
+      yield validator, response
+      if response.status_code != 304:
+        return
+
+  def iter_listing(self, url, embedded_key, params=None, page_size=None,
+                   refresh=False, revalidate=False):
+    """Like iter_pages, but served from the local listing cache when fresh.
+
+    A stale entry is revalidated page by page with
+    If-None-Match/If-Modified-Since: the leading pages that answer 304 are
+    served from the cache and the crawl resumes at the first page that
+    changed, replacing the entry. ``refresh`` skips the cache lookup;
+    ``revalidate`` treats a fresh entry as stale, so pollers pay one
+    conditional request per page.
+    """
+    if self.cache is None:
+      yield from self.iter_pages(url, embedded_key, params, page_size)
+      return
+
+    key = self.cache.key(embedded_key, params)
+    entry = None if refresh else self.cache.load(key)
+    if entry is not None and not revalidate and self.cache.is_fresh(entry):
+      yield from entry['records']
+      return
+
+    records, validators = [], []
+    page_request, response = (url, self._page_params(params, page_size)), None
+    for validator, response in self.revalidate_pages(
+            entry.get('pages') or [] if entry is not None else []):
+      if response.status_code != 304:
+        page_request = validator['url'], validator['params']
+        break
+      page = entry['records'][len(records):len(records) + validator['count']]
+      records.extend(page)
+      validators.append(validator)
+      yield from page
+    else:
+      if validators:
+        self.cache.touch(key, entry)
+        return
+    if response is not None and not response.ok:
+      raise ApiError(response)
+
+    for record in self._crawl(page_request, embedded_key, validators,
+                              response):
+      records.append(record)
+      yield record
+    self.cache.store(key, records, params, validators)
+
+  def update_cache(self, endpoint, id_field, upserts=(), removals=()):
+    """Reflect creates/deletes made through this client in cached listings."""
+    if self.cache is not None:
+      self.cache.apply(endpoint, id_field, upserts, removals)
+
+  def _page_params(self, params, page_size):
+    params = dict(params or {})
+    params['size'] = page_size or params.get('size') or self.page_size
+    return params
+
+  def _get_page(self, url, params):
+    response = self.get(url, params=params)
+    if not response.ok:
+      raise ApiError(response)
+    return response
+
+  def map_requests(self, items, build_request, concurrency=None):
+    """Send one request per item through a bounded worker pool.
+
+    ``build_request(item)`` returns a ``(method, url, kwargs)`` tuple.
+    ``items`` may be any iterable (including a generator); at most
+    ``2 * concurrency`` requests are in flight or queued at a time. Yields
+    ``(item, response, error)`` in completion order, so callers see each
+    outcome as soon as it arrives.
+    """
+    concurrency = concurrency or self.concurrency
+    if concurrency > self.pool_size:
+      self._mount_adapter(concurrency)
+
+    def send(item):
+      method, url, kwargs = build_request(item)
+      return self.request(method, url, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+      yield from complete_in_window(
+        items, lambda item: executor.submit(send, item), concurrency * 2)
+
+  def _mount_adapter(self, pool_size):
+    self.pool_size = pool_size
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    self.session.mount('https://', adapter)
+    self.session.mount('http://', adapter)
+
+  def close(self):
+    self.session.close()
+
+
+class ApiError(Exception):
+  """A Veracode API call returned a non-2xx response."""
+
+  def __init__(self, response):
+    super().__init__(describe_error(response))
+    self.response = response
+
+
+def payload_size(data):
+  """Bytes of a request body given as str or bytes."""
+  if not data:
+    return 0
+  return len(data.encode() if isinstance(data, str) else data)
+
+
+def complete_in_window(items, submit, window):
+  """Yield ``(item, response, error)`` as the futures of ``submit`` finish.
+
+  ``submit(item)`` returns a concurrent.futures.Future; at most ``window``
+  of them are pending at a time, and ``items`` is consumed lazily.
+  """
+  items = iter(items)
+  pending = {}
+  for item in islice(items, window):
+    pending[submit(item)] = item
+  while pending:
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+      item = pending.pop(future)
+      try:
+        yield item, future.result(), None
+      except requests.RequestException as e:
+        yield item, None, e
+    for item in islice(items, len(done)):
+      pending[submit(item)] = item
+
+
+def _next_page(data, url, params):
+  """Return the ``(url, params)`` of the page after ``data``, if any."""
+  next_link = data.get('_links', {}).get('next', {}).get('href')
+  if next_link:
+    return next_link, None
+  page = data.get('page')
+  if page and page['number'] + 1 < page['total_pages']:
+    return url, dict(params or {}, page=page['number'] + 1)
+  return None
+
+
+def describe_error(response):
+  """Best-effort one-line description of a failed API response."""
+  try:
+    return f"{response.status_code} {response.json()['message']}"
+  except (ValueError, KeyError, TypeError):
+    return f"{response.status_code} {response.reason}"
+
+
+def client_class(engine=None):
+  """Client implementation behind the ``--engine`` option."""
+  if engine == 'async':
+    # imported on demand: it needs the optional aiohttp dependency
+    from async_client import AsyncVeracodeApiClient
+    return AsyncVeracodeApiClient
+  return VeracodeApiClient
+
+
+def build_client(ctx):
+  """(Re)build the shared client for the currently activated profile."""
+  setting_dict = ctx.obj['setting']
+  config = ctx.obj['config']
+  client = ctx.obj.get('client')
+  if client is not None:
+    if client.profile == setting_dict['activated_credentials']:
+      return client
+    client.close()
+  client = client_class(ctx.obj.get('engine')).from_profile(
+    config, setting_dict, stats=ctx.obj.get('stats'))
+  ctx.obj['client'] = client
+  return client
+
+
+def activated_client(ctx):
+  """Confirm (or switch) the activated profile, then return its client."""
+  setting_dict = ctx.obj['setting']
+  use_activated_profile = click.confirm(
+    f"Your activated credentials is "
+    f"\"{setting_dict['activated_credentials']}\""
+    f", continue using this profile to run this command?", err=True)
+  while not use_activated_profile:
+    ctx.invoke(activate_credentials)
+    use_activated_profile = click.confirm(
+      f"Your activated credentials is "
+      f"\"{setting_dict['activated_credentials']}\""
+      f", continue using this profile to run this command?", err=True)
+  return build_client(ctx)
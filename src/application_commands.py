@@ -5,140 +5,177 @@
 # @Organisation: Veracode
 
 import click
-from constant import DISPLAY_APPLICATION_FMT, SpinnerThread, \
+from constant import DISPLAY_APPLICATION_FMT, DISPLAY_PROFILE_FMT, \
   APPLICATION_CREATION_INPUT
 import requests
-from veracode_api_signing.plugin_requests import RequestsAuthPluginVeracodeHMAC
 import sys
-from datetime import datetime
-from credentials_commands import activate_credentials
-import copy
-import json
-
-
-def print_applications_header():
-  click.echo(DISPLAY_APPLICATION_FMT.
-             format("ID", "Application", "Policy", "Last Scan"))
-  click.echo(
-    DISPLAY_APPLICATION_FMT.format("-" * 3, "-" * 40, "-" * 40, "-" * 20))
-
-
-def fetch_applications(settings_dict, config):
-  application_list = []
-  spinner_thread = SpinnerThread()
-  spinner_thread.start()
-  api_id = config[settings_dict['activated_credentials']]['veracode_api_key_id']
-  api_key = config[settings_dict['activated_credentials']][
-    'veracode_api_key_secret']
+from api_client import activated_client, ApiError, JSON_HEADERS
+from bulk import run_bulk, print_bulk_summary
+from fanout import resolve_profiles, fan_out, echo_profile_rows
+from stats import LiveStatus, status_until_first
+from output import output_option
+from filters import ListingFilter, parse_api_date, timestamp_since
+from mirror import iter_mirror_rows
+from picker import Picker
+from payload import PayloadTemplate
+from planner import CallPlan, print_call_plan
+from fnmatch import fnmatch
+from datetime import timezone
+
+
+def applications_header(show_profile=False):
+  profile, profile_rule = (DISPLAY_PROFILE_FMT.format("Profile"),
+                           DISPLAY_PROFILE_FMT.format("-" * 16)) \
+    if show_profile else ('', '')
+  return (profile + DISPLAY_APPLICATION_FMT.
+          format("ID", "Application", "Policy", "Last Scan"),
+          profile_rule +
+          DISPLAY_APPLICATION_FMT.format("-" * 3, "-" * 40, "-" * 40, "-" * 20))
+
+
+def print_applications_header(show_profile=False):
+  for line in applications_header(show_profile):
+    click.echo(line)
+
+
+def application_filter(name=None, policy=None, scanned_since=None,
+                       modified_since=None):
+  """ListingFilter for the Applications API.
+
+  Name (partial, case-insensitive) and policy name are query parameters;
+  modified_after only takes a date, compared against UTC timestamps, so
+  the UTC date is sent and the exact time is checked client-side. There is
+  no parameter for the last scan date.
+  """
+  listing_filter = ListingFilter().push(name=name, policy=policy)
+  if modified_since is not None:
+    listing_filter.push(modified_after=modified_since.astimezone(
+      timezone.utc).date().isoformat())
+    listing_filter.require(timestamp_since('modified', modified_since))
+  if scanned_since is not None:
+    listing_filter.require(
+      timestamp_since('last_completed_scan_date', scanned_since))
+  return listing_filter
+
+
+def iter_platform_applications(client, page_size=None, refresh=False,
+                               revalidate=False, listing_filter=None):
+  """Yield every application on the platform (or matching
+  ``listing_filter``), one page at a time.
+
+  RequestException and ApiError propagate to the caller.
+  """
+  listing_filter = listing_filter or ListingFilter()
+  for application in listing_filter.apply(client.iter_listing(
+          client.api_url("/applications"), 'applications',
+          params=listing_filter.params, page_size=page_size, refresh=refresh,
+          revalidate=revalidate)):
+    yield Application.from_api(application)
+
+
+def fetch_applications(client, page_size=None, refresh=False,
+                       listing_filter=None, revalidate=False):
+  """Like iter_platform_applications, behind a status line and error
+  handling."""
   try:
-    response = requests. \
-      get(settings_dict['api_base'] + "/applications",
-          auth=RequestsAuthPluginVeracodeHMAC(api_key_id=api_id,
-                                              api_key_secret=api_key),
-          headers=settings_dict['headers'])
+    yield from status_until_first(
+      iter_platform_applications(client, page_size, refresh, revalidate,
+                                 listing_filter=listing_filter),
+      client.stats, 'Fetching applications')
   except requests.RequestException as e:
     click.echo("Whoops!")
     click.echo(e)
     sys.exit(1)
+  except ApiError as e:
+    click.secho(str(e), fg='red')
 
-  spinner_thread.set_complete()
-  sys.stdout.write('\b')
-
-  if response.ok:
-    data = response.json()
-    for application in data['_embedded']['applications']:
-      local_application = Application(
-        application['profile']['name'],
-        application['profile']['policies'][0]['name'],
-        application['last_completed_scan_date'],
-        application['guid']
-      )
-      application_list.append(local_application)
-  else:
-    click.secho(f"{response.status_code} "
-                f"{response.json()['message']}",
-                fg='red')
-  return application_list
+
+def format_application(idx, application):
+  dt_frm = "%Y-%b-%d %I:%M %p"
+  last_scan_time = "Nil" if not application.last_scan else \
+    parse_api_date(application.last_scan).strftime(dt_frm)
+  return DISPLAY_APPLICATION_FMT.format(idx, application.application_name,
+                                        application.policy_name,
+                                        last_scan_time)
 
 
 def print_applications(application_list):
   for idx, application in enumerate(application_list, start=1):
-    dt_frm = "%Y-%b-%d %I:%M %p"
-    last_scan_time = "Nil" if not application.last_scan else datetime.strptime(
-      application.last_scan, "%Y-%m-%dT%H:%M:%S.%f%z").strftime(dt_frm)
-    click.echo(DISPLAY_APPLICATION_FMT.
-               format(idx, application.application_name,
-                      application.policy_name, last_scan_time))
-
-
-def add_applications_to_platform(application_list, config, settings_dict):
-  api_id = config[settings_dict['activated_credentials']]['veracode_api_key_id']
-  api_key = config[settings_dict['activated_credentials']][
-    'veracode_api_key_secret']
-
-  count = 0
-
-  with click.progressbar(
-          length=len(application_list),
-          show_eta=False,
-          item_show_func=lambda
-                  application_name: f"Adding application: {application_name}"
-  ) as bar:
-    for idx, application in enumerate(application_list, start=1):
-      application_json = application.get_application_json()
-      try:
-        response = requests. \
-          post(settings_dict['api_base'] + "/applications",
-               auth=RequestsAuthPluginVeracodeHMAC(api_key_id=api_id,
-                                                   api_key_secret=api_key),
-               headers={'Content-Type': 'application/json',
-                        'Accept': 'application/json'},
-
-               data=application_json)
-      except requests.RequestException as e:
-        click.echo("Whoops!")
-        click.echo(e)
-        # sys.exit(1)
-
-      if response.ok:
-        count += 1
-      else:
-        click.secho(f"{response.status_code} "
-                    f"{response.json()['message']}",
-                    fg='red')
-        # sys.exit(1)
-      bar.update(idx - 1, application.application_name)
+    click.echo(format_application(idx, application))
+
+
+def diff_applications(application_list, client, refresh=False,
+                      platform_applications=None):
+  """Split ``application_list`` into (to create, already present).
+
+  Names are compared case-insensitively against one listing of the
+  platform (``platform_applications`` if already fetched, else revalidated
+  so a recent deletion is not taken for a present application); repeated
+  names in the input only count once.
+  """
+  if platform_applications is None:
+    platform_applications = fetch_applications(client, refresh=refresh,
+                                               revalidate=True)
+  existing = {application.application_name.lower()
+              for application in platform_applications}
+  inserts, present = [], []
+  for application in application_list:
+    name = application.application_name.lower()
+    if name in existing:
+      present.append(application)
+    else:
+      existing.add(name)
+      inserts.append(application)
+  return inserts, present
+
+
+def create_application_request(client, application):
+  return 'POST', client.api_url("/applications"), \
+         {'headers': JSON_HEADERS, 'data': application.get_application_json()}
+
 
-  click.secho(
-    f'Successfully created {count} applications on Veracode Platform.',
-    fg='green')
+def add_applications_to_platform(application_list, client, concurrency=None,
+                                 preflight=True):
+  """Create ``application_list``; with ``preflight``, names already on the
+  platform are skipped first."""
+  def label(application):
+    return application.application_name
 
+  if preflight:
+    application_list, present = diff_applications(application_list, client)
+    if present:
+      click.secho(f'Skipping {len(present)} applications already present: '
+                  f'{", ".join(label(item) for item in present)}',
+                  fg='yellow')
 
-def delete_one_application(application, settings_dict, config):
-  spinner_thread = SpinnerThread()
+  def build_request(application):
+    return create_application_request(client, application)
 
-  api_id = config[settings_dict['activated_credentials']]['veracode_api_key_id']
-  api_key = config[settings_dict['activated_credentials']][
-    'veracode_api_key_secret']
+  result = run_bulk(client, application_list, build_request,
+                    label=label,
+                    progress_label='Adding application',
+                    concurrency=concurrency)
+  print_bulk_summary(result, label, 'applications', 'created')
+  client.update_cache('applications', 'guid',
+                      upserts=[response.json()
+                               for _, response in result.succeeded])
+  return result
 
+
+def delete_one_application(application, client):
   if click.confirm(f'Delete \"{application.application_name}\", continue?'):
-    spinner_thread.start()
     try:
-      response = requests. \
-        delete(settings_dict[
-                 'api_base'] + "/applications/" + application.application_guid,
-               auth=RequestsAuthPluginVeracodeHMAC(api_key_id=api_id,
-                                                   api_key_secret=api_key),
-               headers=settings_dict['headers'])
+      with LiveStatus(client.stats, 'Deleting application'):
+        response = client.delete(
+          client.api_url("/applications/" + application.application_guid))
     except requests.RequestException as e:
       click.echo("Whoops!")
       click.echo(e)
       sys.exit(1)
 
-    spinner_thread.set_complete()
-    sys.stdout.write('\b')
-
     if response.ok:
+      client.update_cache('applications', 'guid',
+                          removals=[application.application_guid])
       return 'success'
     else:
       click.secho(f"{response.status_code} "
@@ -147,46 +184,137 @@ def delete_one_application(application, settings_dict, config):
       return 'fail'
 
 
+def delete_application_request(client, application):
+  return 'DELETE', \
+         client.api_url("/applications/" + application.application_guid), {}
+
+
+def select_applications(application_list, names=(), guids=(),
+                        select_all=False):
+  """Applications matching any name glob (case-insensitive) or GUID."""
+  if select_all:
+    return list(application_list)
+  patterns = [name.lower() for name in names]
+  guids = set(guids)
+  return [application for application in application_list
+          if application.application_guid in guids
+          or any(fnmatch(application.application_name.lower(), pattern)
+                 for pattern in patterns)]
+
+
+def delete_applications(application_list, client, concurrency=None):
+  """Delete ``application_list`` through the worker pool, then summarise."""
+  def label(application):
+    return application.application_name
+
+  result = run_bulk(client, application_list,
+                    lambda application: delete_application_request(
+                      client, application),
+                    label=label,
+                    progress_label='Deleting application',
+                    concurrency=concurrency)
+  print_bulk_summary(result, label, 'applications', 'deleted')
+  client.update_cache('applications', 'guid',
+                      removals=[application.application_guid
+                                for application, _ in result.succeeded])
+  return result
+
+
+def delete_applications_by_id(application_list, client):
+  """Prompt for one application number at a time, for piped input."""
+  while True:
+    print_applications_header()
+    print_applications(application_list)
+    application_id = click.prompt(
+      "Enter application id (i.e. 3) to delete or \"-1\" to quit", type=int)
+    if application_id == -1:
+      sys.exit(0)
+    if application_id < 1 or application_id > len(application_list):
+      click.secho(f'{application_id} is not in range.', fg='red')
+    else:
+      application = application_list[application_id - 1]
+      result = delete_one_application(application, client)
+      if result == 'fail':
+        sys.exit(1)
+      else:
+        del application_list[application_id - 1]
+
+
 @click.group()
 @click.pass_context
 def applications(ctx):
   """Manage Veracode Applications"""
-  setting_dict = ctx.obj['setting']
   config = ctx.obj['config']
   if not config.sections():
     click.secho(
       'You have not configured Veracode API credentials, '
       'please run \"pov credentials add\" command before running this command.')
     sys.exit(1)
-  use_activated_profile = click.confirm(
-    f"Your activated credentials is "
-    f"\"{setting_dict['activated_credentials']}\""
-    f", continue using this profile to run this command?")
-  while not use_activated_profile:
-    ctx.invoke(activate_credentials)
-    use_activated_profile = click.confirm(
-      f"Your activated credentials is "
-      f"\"{setting_dict['activated_credentials']}\""
-      f", continue using this profile to run this command?")
 
 
 @applications.command('list')
 @click.pass_context
-def list_applications(ctx):
-  """List Veracode Applications"""
-  setting_dict = ctx.obj['setting']
-  config = ctx.obj['config']
-  print_applications_header()
-  application_list = fetch_applications(setting_dict, config)
-  print_applications(application_list)
+@click.option('--page-size', type=click.IntRange(min=1),
+              help='Number of applications requested per page')
+@click.option('--refresh', is_flag=True,
+              help='Ignore the local listing cache')
+@click.option('--all-profiles', is_flag=True,
+              help='List the applications of every credentials profile')
+@click.option('--profiles',
+              help='Comma-separated credentials profiles to list')
+@click.option('-n', '--name',
+              help='Only applications whose name contains this text')
+@click.option('--policy', help='Only applications under this policy')
+@click.option('--scanned-since', type=click.DateTime(),
+              help='Only applications with a scan completed since this '
+                   'local time')
+@click.option('--modified-since', type=click.DateTime(),
+              help='Only applications modified since this local time')
+@click.option('--offline', is_flag=True,
+              help='Read the local mirror written by "pov sync" instead of '
+                   'calling the API')
+@output_option
+def list_applications(ctx, page_size, refresh, all_profiles, profiles, name,
+                      policy, scanned_since, modified_since, offline, output):
+  """List Veracode Applications
+
+  With --all-profiles or --profiles, every profile is queried in parallel
+  and rows are printed as they arrive, tagged with their profile. Filters
+  are sent to the API where it supports them, so only matching
+  applications are downloaded.
+  """
+  listing_filter = application_filter(name, policy, scanned_since,
+                                      modified_since)
+  profiles = resolve_profiles(ctx.obj['config'], all_profiles, profiles)
+  if offline:
+    rows = iter_mirror_rows(
+      profiles or [ctx.obj['setting']['activated_credentials']],
+      lambda mirror: map(Application.from_api, mirror.applications(
+        name, policy, scanned_since, modified_since)))
+  elif profiles is None:
+    client = activated_client(ctx)
+    rows = ((client.profile, application, None) for application in
+            fetch_applications(client, page_size, refresh, listing_filter))
+  else:
+    rows = fan_out(ctx.obj['config'], ctx.obj['setting'], profiles,
+                   lambda client: iter_platform_applications(
+                     client, page_size, refresh,
+                     listing_filter=listing_filter),
+                   ctx.obj.get('engine'), ctx.obj.get('stats'))
+  if output == 'table':
+    print_applications_header(show_profile=profiles is not None)
+  if echo_profile_rows(rows, format_application, Application.FIELDS, output,
+                       show_profile=profiles is not None):
+    sys.exit(1)
 
 
 @applications.command('add')
 @click.pass_context
-def add_application(ctx):
+@click.option('-c', '--concurrency', type=click.IntRange(min=1),
+              help='Number of applications to create in parallel')
+def add_application(ctx, concurrency):
   """Add Veracode Applications"""
-  setting_dict = ctx.obj['setting']
-  config = ctx.obj['config']
+  client = activated_client(ctx)
   application_list = []
   while True:
     application_name = click.prompt("Please enter the name of the Application")
@@ -199,37 +327,90 @@ def add_application(ctx):
     if not click.confirm(f'Add more users in this Veracode account?'):
       break
   click.echo('Adding applications to Veracode Platform...')
-  add_applications_to_platform(application_list, config, setting_dict)
+  add_applications_to_platform(application_list, client, concurrency)
 
 
 @applications.command('delete')
 @click.pass_context
-def delete_application(ctx):
-  """Delete a Veracode Application"""
-  config = ctx.obj['config']
-  setting_dict = ctx.obj['setting']
-  
-  application_list = fetch_applications(setting_dict, config)
+@click.option('-n', '--name', 'names', multiple=True,
+              help='Delete applications whose name matches this glob '
+                   '(repeatable)')
+@click.option('--id', 'guids', multiple=True,
+              help='Delete the application with this GUID (repeatable)')
+@click.option('--all', 'select_all', is_flag=True,
+              help='Delete every application')
+@click.option('-y', '--yes', is_flag=True,
+              help='Do not ask for confirmation')
+@click.option('-c', '--concurrency', type=click.IntRange(min=1),
+              help='Number of applications to delete in parallel')
+@click.option('--refresh', is_flag=True,
+              help='Ignore the local listing cache')
+@click.option('--dry-run', is_flag=True,
+              help='Count the API calls per endpoint and estimate how long '
+                   'they take, then exit without deleting anything')
+def delete_application(ctx, names, guids, select_all, yes, concurrency,
+                       refresh, dry_run):
+  """Delete Veracode Applications
+
+  Without --name, --id or --all, applications are picked interactively:
+  type to search, Tab to select, Enter to delete the selection.
+  """
+  client = activated_client(ctx)
+
+  application_list = list(fetch_applications(client, refresh=refresh))
+
+  if names or guids or select_all:
+    selected = select_applications(application_list, names, guids,
+                                   select_all)
+    missing = set(guids) - {application.application_guid
+                            for application in selected}
+    if missing:
+      click.secho(f'Application not found: {", ".join(sorted(missing))}',
+                  fg='yellow')
+  elif sys.stdin.isatty():
+    selected = Picker(application_list,
+                      lambda application: application.application_name,
+                      format_application, applications_header()).run()
+  elif dry_run:
+    click.secho('--dry-run needs --name, --id or --all when the input is not '
+                'a terminal.', fg='red')
+    sys.exit(1)
+  else:
+    delete_applications_by_id(application_list, client)
+    return
 
-  while True:
-    print_applications_header()
-    print_applications(application_list)
-    application_id = click.prompt(
-      "Enter application id (i.e. 3) to delete or \"-1\" to quit", type=int)
-    if application_id == -1:
-      sys.exit(0)
-    if application_id < 1 or application_id > len(application_list):
-      click.secho(f'{application_id} is not in range.', fg='red')
-    else:
-      application = application_list[application_id - 1]
-      result = delete_one_application(application, setting_dict, config)
-      if result == 'fail':
-        sys.exit(1)
-      else:
-        del application_list[application_id - 1]
+  if not selected:
+    click.secho('No applications to delete.', fg='yellow')
+    return
+  print_applications_header()
+  print_applications(selected)
+  if dry_run:
+    call_plan = CallPlan()
+    call_plan.add_listing(client.api_url('/applications'),
+                          len(application_list), client.page_size)
+    call_plan.add_requests(selected,
+                           lambda application: delete_application_request(
+                             client, application))
+    print_call_plan(call_plan, client, concurrency)
+    return
+  if not yes and not click.confirm(
+          f'Delete these {len(selected)} applications, continue?'):
+    sys.exit(0)
+  result = delete_applications(selected, client, concurrency)
+  if result.failed:
+    sys.exit(1)
+
+
+APPLICATION_TEMPLATE = PayloadTemplate(
+  APPLICATION_CREATION_INPUT, {'name': ('profile', 'name'),
+                               'description': ('profile', 'description')})
 
 
 class Application:
+  FIELDS = ('guid', 'name', 'policy', 'last_scan')
+  __slots__ = ('application_name', 'policy_name', 'last_scan',
+               'application_guid')
+
   def __init__(self, application_name, policy_name, last_scan,
                application_guid):
     self.application_name = application_name
@@ -237,8 +418,19 @@ class Application:
     self.last_scan = last_scan
     self.application_guid = application_guid
 
+  @classmethod
+  def from_api(cls, data):
+    return cls(data['profile']['name'],
+               data['profile']['policies'][0]['name'],
+               data.get('last_completed_scan_date'),
+               data['guid'])
+
+  def to_dict(self):
+    return {'guid': self.application_guid,
+            'name': self.application_name,
+            'policy': self.policy_name,
+            'last_scan': self.last_scan}
+
   def get_application_json(self):
-    application_dict = copy.deepcopy(APPLICATION_CREATION_INPUT)
-    application_dict['profile']['name'] = self.application_name
-    application_dict['profile']['description'] = self.application_name
-    return json.dumps(application_dict)
+    return APPLICATION_TEMPLATE.render(name=self.application_name,
+                                       description=self.application_name)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 20/10/2026 4:40 pm
+# @Organisation: Veracode
+
+import asyncio
+import json
+import threading
+import time
+
+import click
+import requests
+from veracode_api_signing.validation import validate_api_key_id, \
+  validate_api_key_secret
+from veracode_api_signing.veracode_hmac_auth import \
+  generate_veracode_hmac_header
+
+from api_client import VeracodeApiClient, complete_in_window, payload_size
+
+try:
+  import aiohttp
+  from yarl import URL
+except ImportError:  # optional dependency, only needed for --engine async
+  aiohttp = None
+
+
+class AsyncVeracodeApiClient(VeracodeApiClient):
+  """VeracodeApiClient whose HTTP calls all run on one asyncio event loop.
+
+  The loop runs in a background thread and owns a single aiohttp session,
+  so connections are pooled across every request. The synchronous
+  interface is unchanged: ``request`` blocks on a coroutine, and
+  ``map_requests`` schedules the whole batch on the loop behind a
+  semaphore instead of a thread pool. Pagination, the listing cache, rate
+  limiting and retries are inherited.
+  """
+
+  def _open_session(self, api_id, api_key, headers):
+    if aiohttp is None:
+      raise click.ClickException(
+        'The async engine needs aiohttp, please run "pip install aiohttp".')
+    validate_api_key_id(api_id)
+    validate_api_key_secret(api_key)
+    self.api_id = api_id
+    self.api_key = api_key
+    self.loop = asyncio.new_event_loop()
+    self.loop_thread = threading.Thread(target=self.loop.run_forever,
+                                        daemon=True)
+    self.loop_thread.start()
+    self.headers = headers
+    self.retired_sessions = []
+    self.session = self._run(self._create_session(headers))
+
+  async def _create_session(self, headers):
+    connector = aiohttp.TCPConnector(
+      limit=max(self.pool_size, self.concurrency))
+    return aiohttp.ClientSession(connector=connector, headers=headers)
+
+  def _mount_adapter(self, pool_size):
+    """Grow the connection limit, like the threads engine does.
+
+    A connector's limit is fixed, so new requests move to a fresh session;
+    the old one may still have requests in flight (listings fetched next
+    to a bulk run) and is closed with the client.
+    """
+    self.pool_size = pool_size
+    self.retired_sessions.append(self.session)
+    self.session = self._run(self._create_session(self.headers))
+
+  def _run(self, coroutine):
+    return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+  def request(self, method, url, **kwargs):
+    return self._run(self.request_async(method, url, **kwargs))
+
+  async def request_async(self, method, url, params=None, data=None,
+                          headers=None, timeout=None):
+    """Coroutine version of ``VeracodeApiClient.request``."""
+    attempt = 0
+    while True:
+      waited = 0.0
+      delay = self.rate_limiter.reserve()
+      while delay:
+        await asyncio.sleep(delay)
+        waited += delay
+        delay = self.rate_limiter.reserve()
+      started = time.perf_counter()
+      try:
+        response = await self._send(method, url, params, data, headers,
+                                    timeout or self.timeout)
+      except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        self.stats.record(method, url, time.perf_counter() - started)
+        delay = self._retry_delay(method, attempt)
+        if delay is None:
+          raise _as_requests_error(e) from e
+      else:
+        self.stats.record(method, url, time.perf_counter() - started,
+                          response.status_code, payload_size(data),
+                          len(response.content))
+        delay = self._retry_delay(method, attempt, response)
+        if delay is None:
+          self._record_wait(waited)
+          return response
+      self._record_wait(waited + delay, retried=True)
+      self.stats.record_retry(method, url)
+      await asyncio.sleep(delay)
+      attempt += 1
+
+  async def _send(self, method, url, params, data, headers, timeout):
+    url = URL(url)
+    if params:
+      url = url.update_query({key: value for key, value in params.items()
+                              if value is not None})
+    headers = dict(headers or {})
+    headers['Authorization'] = generate_veracode_hmac_header(
+      url.host, url.raw_path_qs, method, self.api_id, self.api_key)
+    async with self.session.request(
+            method, url, data=data, headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+      return AsyncResponse(response.status, response.reason,
+                           response.headers, await response.read())
+
+  def map_requests(self, items, build_request, concurrency=None):
+    """Same contract as ``VeracodeApiClient.map_requests``.
+
+    Requests are coroutines on the client's event loop; ``concurrency``
+    bounds how many are in flight through a semaphore.
+    """
+    concurrency = concurrency or self.concurrency
+    if concurrency > max(self.pool_size, self.concurrency):
+      self._mount_adapter(concurrency)
+    semaphore = self._run(_semaphore(concurrency))
+
+    async def send(item):
+      method, url, kwargs = build_request(item)
+      async with semaphore:
+        return await self.request_async(method, url, **kwargs)
+
+    yield from complete_in_window(
+      items,
+      lambda item: asyncio.run_coroutine_threadsafe(send(item), self.loop),
+      concurrency * 2)
+
+  def close(self):
+    for session in self.retired_sessions + [self.session]:
+      self._run(session.close())
+    self.loop.call_soon_threadsafe(self.loop.stop)
+    self.loop_thread.join()
+    self.loop.close()
+
+
+class AsyncResponse:
+  """The parts of ``requests.Response`` the commands rely on."""
+
+  def __init__(self, status_code, reason, headers, content):
+    self.status_code = status_code
+    self.reason = reason
+    self.headers = headers
+    self.content = content
+
+  @property
+  def ok(self):
+    return self.status_code < 400
+
+  @property
+  def text(self):
+    return self.content.decode('utf-8', errors='replace')
+
+  def json(self):
+    return json.loads(self.content)
+
+
+async def _semaphore(value):
+  # created on the event loop it is used from
+  return asyncio.Semaphore(value)
+
+
+def _as_requests_error(error):
+  """Map aiohttp failures onto the requests exceptions commands handle."""
+  if isinstance(error, asyncio.TimeoutError):
+    return requests.Timeout(str(error) or 'Request timed out')
+  return requests.ConnectionError(str(error))
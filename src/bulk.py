@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 18/10/2026 10:03 am
+# @Organisation: Veracode
+
+import queue
+import threading
+import time
+
+import click
+
+from api_client import describe_error
+
+
+class BulkResult:
+  """Per-item outcome of a bulk operation."""
+
+  def __init__(self):
+    self.succeeded = []  # (item, response)
+    self.failed = []  # (item, reason)
+    self.retries = 0
+    self.throttle_time = 0.0
+
+  def __len__(self):
+    return len(self.succeeded) + len(self.failed)
+
+
+def run_bulk(client, items, build_request, label, progress_label,
+             concurrency=None, on_result=None):
+  """Run one request per item concurrently behind a progress bar.
+
+  ``label(item)`` names the item in the progress bar and summary.
+  ``on_result(item, response, reason)`` is called from the calling thread
+  for every completed item, ``reason`` being None on success. The
+  progress bar shows the ETA and the live request rate; when ``items``
+  has no length (a generator fed while the run goes) it shows the count
+  done instead.
+  """
+  result = BulkResult()
+  retries, throttle_time = client.retries, client.throttle_time
+  started, requests_before = time.monotonic(), client.stats.requests
+  length = len(items) if hasattr(items, '__len__') else None
+  with click.progressbar(
+          client.map_requests(items, build_request, concurrency),
+          length=length,
+          show_eta=length is not None,
+          show_pos=length is None,
+          item_show_func=lambda outcome: f"{progress_label}: "
+          f"{label(outcome[0])} "
+          f"({client.stats.rate(started, requests_before):.1f} req/s)"
+          if outcome else None
+  ) as bar:
+    for item, response, error in bar:
+      if error is not None:
+        reason = str(error)
+      elif not response.ok:
+        reason = describe_error(response)
+      else:
+        reason = None
+
+      if reason is None:
+        result.succeeded.append((item, response))
+      else:
+        result.failed.append((item, reason))
+      if on_result is not None:
+        on_result(item, response, reason)
+  result.retries = client.retries - retries
+  result.throttle_time = client.throttle_time - throttle_time
+  return result
+
+
+def merge_streams(producers, queue_size):
+  """Stream the items of every ``producers`` iterable as they are produced.
+
+  Each producer starts straight away in its own thread and feeds one
+  bounded queue, so it is never more than ``queue_size`` items ahead of
+  the consumer, and slow producers (parsing a workbook, fetching a
+  listing) overlap with whatever consumes the stream. An exception raised
+  by a producer is re-raised in the consumer.
+  """
+  done = object()
+  channel = queue.Queue(maxsize=queue_size)
+
+  def produce(producer):
+    try:
+      for item in producer:
+        channel.put((item, None))
+    except BaseException as e:
+      channel.put((done, e))
+    else:
+      channel.put((done, None))
+
+  for producer in producers:
+    threading.Thread(target=produce, args=(producer,), daemon=True).start()
+
+  def consume(running):
+    while running:
+      item, error = channel.get()
+      if item is not done:
+        yield item
+      elif error is not None:
+        raise error
+      else:
+        running -= 1
+  return consume(len(producers))
+
+
+def print_bulk_summary(result, label, noun, verb):
+  click.secho(f'Successfully {verb} {len(result.succeeded)} {noun}.',
+              fg='green')
+  if result.failed:
+    click.secho(f'{len(result.failed)} {noun} failed:', fg='red')
+    for item, reason in result.failed:
+      click.secho(f'  {label(item)}: {reason}', fg='red')
+  if result.retries or result.throttle_time >= 0.1:
+    click.secho(f'Retried {result.retries} requests; workers spent '
+                f'{result.throttle_time:.1f}s waiting on rate limits.',
+                fg='yellow')
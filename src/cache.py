@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 18/10/2026 11:20 am
+# @Organisation: Veracode
+
+import hashlib
+import json
+import os
+import time
+
+from constant import CACHE, profile_filename
+
+# query parameters that do not narrow a listing down
+UNFILTERED_PARAMS = {'size', 'page', 'detailed'}
+
+
+class ListingCache:
+  """On-disk cache of API listings, one JSON file per profile and endpoint.
+
+  Each entry keeps the raw records plus the ETag/Last-Modified validators of
+  every page, so a stale entry can be revalidated with conditional
+  requests instead of a full crawl.
+  """
+
+  def __init__(self, profile, ttl):
+    self.directory = CACHE / profile_filename(profile)
+    self.ttl = ttl
+
+  @staticmethod
+  def key(endpoint, params=None):
+    params = {k: v for k, v in (params or {}).items()
+              if v is not None and k not in ('size', 'page')}
+    if not params:
+      return endpoint
+    digest = hashlib.sha1(
+      json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+    return f'{endpoint}-{digest}'
+
+  def load(self, key):
+    try:
+      with open(self._path(key), 'r') as fp:
+        return json.load(fp)
+    except (OSError, ValueError):
+      return None
+
+  def is_fresh(self, entry):
+    return time.time() - entry['fetched_at'] < self.ttl
+
+  def store(self, key, records, params=None, pages=None):
+    """Save a listing with the validators of its pages (see
+    ``VeracodeApiClient.revalidate_pages``)."""
+    self._write(key, {
+      'fetched_at': time.time(),
+      'filtered': bool(set(params or {}) - UNFILTERED_PARAMS),
+      'pages': pages or [],
+      'records': records,
+    })
+
+  def touch(self, key, entry):
+    entry['fetched_at'] = time.time()
+    self._write(key, entry)
+
+  def apply(self, endpoint, id_field, upserts=(), removals=()):
+    """Update every cached listing of ``endpoint`` in place.
+
+    ``upserts`` are raw records created or changed through this tool and
+    ``removals`` are ids that were deleted. Unfiltered listings take the
+    upserts in place; a filtered listing cannot tell whether a record
+    (still) matches its filter, so upserts mark it stale and its next read
+    crawls again.
+    """
+    upserts = {record[id_field]: record for record in upserts}
+    removals = set(removals)
+    if not upserts and not removals:
+      return
+    for path in self.directory.glob(f'{endpoint}*.json'):
+      key = path.stem
+      if key != endpoint and not key.startswith(endpoint + '-'):
+        continue
+      entry = self.load(key)
+      if entry is None:
+        continue
+      records = [record for record in entry['records']
+                 if record[id_field] not in removals]
+      if not entry['filtered']:
+        present = {record[id_field] for record in records}
+        records = [upserts.get(record[id_field], record)
+                   for record in records]
+        records.extend(record for record_id, record in upserts.items()
+                       if record_id not in present)
+      elif upserts:
+        entry['fetched_at'] = 0
+      entry['records'] = records
+      # the platform pages changed under these validators
+      entry['pages'] = []
+      self._write(key, entry)
+
+  def _path(self, key):
+    return self.directory / f'{key}.json'
+
+  def _write(self, key, entry):
+    self.directory.mkdir(parents=True, exist_ok=True)
+    path = self._path(key)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as fp:
+      json.dump(entry, fp)
+    os.replace(tmp_path, path)
@@ -4,21 +4,48 @@
 # @Time: 19/10/2022 12:44 pm
 # @Organisation: Veracode
 from pathlib import Path
-import threading
-import sys
-import time
 import json
+import re
 
 CREDENTIALS = Path.home() / ".veracode" / "credentials"
 SETTINGS = Path.home() / ".veracode" / "settings.json"
 USER = Path.home() / ".veracode" / "user-creation-input.json"
+CACHE = Path.home() / ".veracode" / "cache"
+JOURNAL = Path.home() / ".veracode" / "journal"
+SCAN_LOGS = Path.home() / ".veracode" / "scan-logs"
+MIRROR = Path.home() / ".veracode" / "mirror"
+MIRROR_FULL_SYNC_AGE = 24 * 3600  # seconds between full application crawls
 DISPLAY_APPLICATION_FMT = "{:<3} {:40} {:40} {:20}"
+DISPLAY_PLAN_FMT = "{:12} {:>8} {:>16}"
+DISPLAY_PROFILE_FMT = "{:16.16} "
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 60
+DEFAULT_CONCURRENCY = 8
+PIPELINE_QUEUE_SIZE = 256  # parsed rows buffered ahead of the workers
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500  # the largest page the listing APIs serve
+DEFAULT_CACHE_TTL = 300  # seconds
+DEFAULT_RATE_LIMIT = 25  # requests per second
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_ENGINE = 'threads'  # or 'async', needs aiohttp
+DEFAULT_SCAN_JOBS = 4
+DEFAULT_SCAN_TIMEOUT = 3600  # seconds per wrapper invocation
+DEFAULT_WATCH_INTERVAL = 15  # seconds between polls while scans finish
+DEFAULT_WATCH_MAX_INTERVAL = 300
 
 SETTINGS_INIT_DICT = {
   'activated_credentials': 'default',
   'api_base': 'https://api.veracode.com/appsec/v1',
   'admin_base': 'https://api.veracode.com/api/authn/v2',
   'headers': {"User-Agent": "Python HMAC"},
+  'pool_size': DEFAULT_POOL_SIZE,
+  'timeout': DEFAULT_TIMEOUT,
+  'concurrency': DEFAULT_CONCURRENCY,
+  'page_size': DEFAULT_PAGE_SIZE,
+  'cache_ttl': DEFAULT_CACHE_TTL,
+  'rate_limit': DEFAULT_RATE_LIMIT,
+  'max_retries': DEFAULT_MAX_RETRIES,
+  'engine': DEFAULT_ENGINE,
 }
 
 USER_CREATION_INPUT = {
@@ -80,25 +107,11 @@ APPLICATION_CREATION_INPUT = {
 }
 
 
+def profile_filename(profile):
+  """Make a credentials profile name safe to use as a file name."""
+  return re.sub(r'[^\w.-]', '_', profile)
+
+
 def save_settings(setting_dict):
   with open(SETTINGS, 'w') as fp:
     fp.write(json.dumps(setting_dict, indent=4))
-
-
-class SpinnerThread(threading.Thread):
-  def __init__(self):
-    super().__init__(target=self._spin)
-    self.done = False
-
-  def set_complete(self):
-    self.done = True
-
-  def _spin(self):
-    while True:
-      for t in '|/-\\':
-        sys.stdout.write(t)
-        sys.stdout.flush()
-        time.sleep(0.1)
-        sys.stdout.write('\b')
-        if self.done:
-          return
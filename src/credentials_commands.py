@@ -7,8 +7,10 @@
 import sys
 import click
 from constant import CREDENTIALS, save_settings
+from output import output_option, RowWriter
 
 DISPLAY_CREDENTIALS_FMT = "{:<3} {:10} {:32} {:<6}"
+CREDENTIAL_FIELDS = ('profile', 'api_key_id', 'active')
 
 
 def print_credentials_header():
@@ -18,19 +20,25 @@ def print_credentials_header():
     DISPLAY_CREDENTIALS_FMT.format("-" * 3, "-" * 10, "-" * 32, "-" * 6))
 
 
-def print_credentials(config, setting):
-  sections = config.sections()
-
-  for idx, section in enumerate(sections, start=1):
+def iter_credentials(config, setting):
+  """One dict per profile; the API key secret is never included."""
+  for section in config.sections():
     if 'veracode_api_key_id' not in config[section].keys() or \
             'veracode_api_key_secret' not in config[section].keys():
       raise click.ClickException('Cannot parse credentials file.')
+    yield {'profile': section,
+           'api_key_id': config[section]['veracode_api_key_id'],
+           'active': section == setting['activated_credentials']}
+
+
+def print_credentials(config, setting):
+  for idx, credential in enumerate(iter_credentials(config, setting),
+                                   start=1):
     click.echo(DISPLAY_CREDENTIALS_FMT.
                format(idx,
-                      section,
-                      config[section]['veracode_api_key_id'],
-                      "Yes" if section == setting['activated_credentials']
-                      else "No"))
+                      credential['profile'],
+                      credential['api_key_id'],
+                      "Yes" if credential['active'] else "No"))
 
 
 def save_credentials(config):
@@ -47,12 +55,18 @@ def credentials(ctx):
 
 @credentials.command('list')
 @click.pass_context
-def list_credentials(ctx):
+@output_option
+def list_credentials(ctx, output):
   """List Veracode API Credentials"""
-  print_credentials_header()
   config = ctx.obj['config']
   setting = ctx.obj['setting']
-  print_credentials(config, setting)
+  if output == 'table':
+    print_credentials_header()
+    print_credentials(config, setting)
+    return
+  with RowWriter(output, CREDENTIAL_FIELDS) as writer:
+    for credential in iter_credentials(config, setting):
+      writer.write_row(credential)
 
 
 @credentials.command('add')
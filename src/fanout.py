@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 20/10/2026 2:10 pm
+# @Organisation: Veracode
+
+import queue
+import threading
+
+import click
+
+from api_client import client_class
+from constant import DISPLAY_PROFILE_FMT
+from output import RowWriter
+
+_DONE = object()
+
+
+def resolve_profiles(config, all_profiles=False, profiles=None):
+  """Profiles selected by --all-profiles / --profiles, or None for neither."""
+  if all_profiles:
+    return config.sections()
+  if not profiles:
+    return None
+  selected = [profile.strip() for profile in profiles.split(',')
+              if profile.strip()]
+  unknown = [profile for profile in selected
+             if profile not in config.sections()]
+  if unknown:
+    raise click.BadParameter(f'unknown profile {", ".join(unknown)}',
+                             param_hint="'--profiles'")
+  return list(dict.fromkeys(selected))
+
+
+def fan_out(config, settings_dict, profiles, fetch, engine=None, stats=None):
+  """Run ``fetch(client)`` for every profile concurrently and merge results.
+
+  Each profile gets its own pooled client (of the ``engine`` selected with
+  --engine, recording into the shared ``stats``) and worker thread. Yields
+  ``(profile, item, error)`` as soon as any profile produces an item, so a
+  slow tenant never holds back the others; a profile that fails yields
+  one final tuple with ``item`` None and the exception.
+  """
+  results = queue.Queue()
+  stop = threading.Event()
+
+  def worker(profile):
+    client = None
+    try:
+      client = client_class(engine).from_profile(config, settings_dict,
+                                                 profile, stats)
+      for item in fetch(client):
+        if stop.is_set():
+          return
+        results.put((profile, item, None))
+    except Exception as e:  # one broken profile must not stop the others
+      results.put((profile, None, e))
+    finally:
+      if client is not None:
+        client.close()
+      results.put((profile, _DONE, None))
+
+  for profile in profiles:
+    threading.Thread(target=worker, args=(profile,), daemon=True).start()
+  try:
+    running = len(profiles)
+    while running:
+      profile, item, error = results.get()
+      if item is _DONE:
+        running -= 1
+      else:
+        yield profile, item, error
+  finally:
+    stop.set()
+
+
+def echo_profile_rows(rows, format_row, fieldnames, output='table',
+                      show_profile=False):
+  """Write ``(profile, item, error)`` rows as they arrive.
+
+  ``table`` writes ``format_row(idx, item)``, prefixed by the profile when
+  ``show_profile``; the other formats write ``item.to_dict()`` tagged with
+  the profile, with ``fieldnames`` as the csv columns. Errors go to stderr.
+  Returns the profiles that failed.
+  """
+  failed = []
+  idx = 0
+  with RowWriter(output, ['profile'] + list(fieldnames)) as writer:
+    for profile, item, error in rows:
+      if error is not None:
+        click.secho(f'{profile}: {error}', fg='red', err=True)
+        failed.append(profile)
+      elif output != 'table':
+        writer.write_row(dict(profile=profile, **item.to_dict()))
+      else:
+        idx += 1
+        row = format_row(idx, item)
+        writer.write_line(DISPLAY_PROFILE_FMT.format(profile) + row
+                          if show_profile else row)
+  return failed
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 21/10/2026 4:10 pm
+# @Organisation: Veracode
+
+from datetime import datetime
+
+API_DATE_FMT = "%Y-%m-%dT%H:%M:%S.%f%z"
+
+
+def parse_api_date(value):
+  """Timezone-aware datetime of an API timestamp, or None."""
+  if not value:
+    return None
+  return datetime.strptime(value, API_DATE_FMT)
+
+
+class ListingFilter:
+  """Narrowing of a listing call.
+
+  ``params`` are sent as query parameters so the platform only returns
+  matching records; ``predicates`` test raw API records client-side, for
+  the conditions the endpoint cannot express (or only coarsely, like a
+  date-granular parameter for a timestamp).
+  """
+
+  def __init__(self):
+    self.params = {}
+    self.predicates = []
+
+  def push(self, **params):
+    self.params.update({key: value for key, value in params.items()
+                        if value is not None})
+    return self
+
+  def require(self, predicate):
+    self.predicates.append(predicate)
+    return self
+
+  def matches(self, record):
+    return all(predicate(record) for predicate in self.predicates)
+
+  def apply(self, records):
+    if not self.predicates:
+      return records
+    return (record for record in records if self.matches(record))
+
+  def __bool__(self):
+    return bool(self.params or self.predicates)
+
+
+def timestamp_since(field, moment):
+  """Predicate: the timestamp ``field`` of a record is at or after
+  ``moment`` (a naive ``moment`` is local time)."""
+  moment = moment.astimezone()
+
+  def predicate(record):
+    value = parse_api_date(record.get(field))
+    return value is not None and value >= moment
+
+  return predicate
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 18/10/2026 1:36 pm
+# @Organisation: Veracode
+
+import csv
+import json
+from pathlib import Path
+
+import click
+import openpyxl
+
+from application_commands import Application
+from user_commands import User
+from scan_pool import ScanJob
+
+APPLICATION_SHEET = 0
+USER_SHEET = 1
+SCAN_SHEET = 2
+APPLICATION_COLUMNS = ('application_name',)
+USER_COLUMNS = ('email', 'first_name', 'last_name')
+SCAN_COLUMNS = ('application_name', 'artifact_path', 'version')
+
+
+def _normalise(header):
+  return str(header or '').strip().lower().replace(' ', '_')
+
+
+def _iter_xlsx_rows(path, sheet_index):
+  workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+  try:
+    if sheet_index >= len(workbook.sheetnames):
+      raise click.ClickException(f'{path} has no sheet #{sheet_index + 1}.')
+    rows = workbook.worksheets[sheet_index].iter_rows(values_only=True)
+    headers = [_normalise(header) for header in next(rows, ())]
+    for row in rows:
+      yield dict(zip(headers, row))
+  finally:
+    workbook.close()
+
+
+def _iter_csv_rows(path):
+  with open(path, 'r', newline='', encoding='utf-8-sig') as fp:
+    reader = csv.reader(fp)
+    headers = [_normalise(header) for header in next(reader, ())]
+    for row in reader:
+      yield dict(zip(headers, row))
+
+
+def _iter_jsonl_rows(path):
+  with open(path, 'r', encoding='utf-8') as fp:
+    for line_number, line in enumerate(fp, start=1):
+      if not line.strip():
+        continue
+      try:
+        record = json.loads(line)
+      except ValueError:
+        raise click.ClickException(
+          f'Cannot parse line {line_number} of {path}.')
+      yield {_normalise(key): value for key, value in record.items()}
+
+
+def _iter_json_rows(path):
+  with open(path, 'r', encoding='utf-8') as fp:
+    try:
+      records = json.load(fp)
+    except ValueError:
+      raise click.ClickException(f'Cannot parse {path}.')
+  if not isinstance(records, list):
+    raise click.ClickException(f'{path} must contain a JSON array.')
+  for record in records:
+    yield {_normalise(key): value for key, value in record.items()}
+
+
+def _open_rows(path, sheet_index):
+  suffix = Path(path).suffix.lower()
+  if suffix in ('.xlsx', '.xlsm'):
+    return _iter_xlsx_rows(path, sheet_index)
+  if suffix == '.csv':
+    return _iter_csv_rows(path)
+  if suffix in ('.jsonl', '.ndjson'):
+    return _iter_jsonl_rows(path)
+  if suffix == '.json':
+    return _iter_json_rows(path)
+  raise click.ClickException(f'Unsupported inventory format: {path}')
+
+
+def _check_columns(path, row, columns):
+  if not set(columns) <= set(row):
+    raise click.ClickException(
+      f'Cannot parse {path}, expected columns: '
+      f'{", ".join(column.replace("_", " ").title() for column in columns)}')
+
+
+def iter_rows(path, sheet_index, columns):
+  """Stream the rows of one inventory sheet as dicts of ``columns``.
+
+  ``path`` may be an .xlsx workbook (``sheet_index`` picks the sheet), a
+  .csv file, a .jsonl file or a .json array of objects. Headers are matched case-insensitively with
+  spaces treated as underscores, so "First Name" and "first_name" are the
+  same column. Rows with a blank required column are skipped.
+  """
+  first = True
+  for row in _open_rows(path, sheet_index):
+    if first:
+      _check_columns(path, row, columns)
+    first = False
+    values = tuple(str(row.get(column) or '').strip() for column in columns)
+    if all(values):
+      yield values
+
+
+def check_rows(path, sheet_index, columns):
+  """Fail like ``iter_rows`` would on a malformed sheet, reading only its
+  first row, so a streamed run can be refused before it starts."""
+  rows = _open_rows(path, sheet_index)
+  try:
+    row = next(rows, None)
+  finally:
+    rows.close()
+  if row is not None:
+    _check_columns(path, row, columns)
+
+
+def check_applications(path):
+  check_rows(path, APPLICATION_SHEET, APPLICATION_COLUMNS)
+
+
+def check_users(path):
+  check_rows(path, USER_SHEET, USER_COLUMNS)
+
+
+def iter_applications(path):
+  for application_name, in iter_rows(path, APPLICATION_SHEET,
+                                     APPLICATION_COLUMNS):
+    yield Application(application_name, 'Veracode Recommended High + SCA',
+                      None, '')
+
+
+def iter_users(path):
+  for email, first_name, last_name in iter_rows(path, USER_SHEET,
+                                                USER_COLUMNS):
+    yield User(first_name, last_name, email, email)  # username is email
+
+
+def iter_scan_jobs(path):
+  for application_name, artifact_path, version in iter_rows(path, SCAN_SHEET,
+                                                            SCAN_COLUMNS):
+    yield ScanJob(application_name, artifact_path, version)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 18/10/2026 2:48 pm
+# @Organisation: Veracode
+
+import json
+import time
+
+from constant import JOURNAL, profile_filename
+
+
+class ProvisioningJournal:
+  """Append-only JSON Lines log of bulk creation outcomes for one profile.
+
+  Every finished item is written as one line and flushed straight away, so
+  a run that dies halfway leaves an accurate record behind. With ``resume``
+  the previous log is replayed and items already created can be skipped;
+  otherwise it is truncated. A ``read_only`` journal only replays (for
+  dry runs) and cannot record.
+  """
+
+  def __init__(self, profile, resume=False, read_only=False):
+    self.path = JOURNAL / f'{profile_filename(profile)}.jsonl'
+    self.created = set()
+    if resume:
+      self._replay()
+    self.fp = None
+    if not read_only:
+      self.path.parent.mkdir(parents=True, exist_ok=True)
+      self.fp = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+  def _replay(self):
+    try:
+      with open(self.path, 'r', encoding='utf-8') as fp:
+        for line in fp:
+          try:
+            entry = json.loads(line)
+          except ValueError:
+            continue  # torn last line of an interrupted run
+          key = (entry['kind'], entry['key'])
+          if entry['status'] == 'created':
+            self.created.add(key)
+          else:
+            self.created.discard(key)
+    except FileNotFoundError:
+      pass
+
+  def is_created(self, kind, key):
+    return (kind, key.lower()) in self.created
+
+  def record(self, kind, key, status, **details):
+    key = key.lower()
+    if status == 'created':
+      self.created.add((kind, key))
+    entry = dict(kind=kind, key=key, status=status, time=time.time(),
+                 **details)
+    self.fp.write(json.dumps(entry) + '\n')
+    self.fp.flush()
+
+  def remaining(self, kind, items, key):
+    """Drop the items a previous run already created."""
+    remaining = [item for item in items
+                 if not self.is_created(kind, key(item))]
+    return remaining, len(items) - len(remaining)
+
+  def recorder(self, kind, key, id_field):
+    """Build a run_bulk ``on_result`` callback that journals each outcome."""
+    def on_result(item, response, reason):
+      if reason is None:
+        self.record(kind, key(item), 'created',
+                    id=response.json().get(id_field))
+      else:
+        self.record(kind, key(item), 'failed',
+                    status_code=None if response is None
+                    else response.status_code,
+                    reason=reason)
+    return on_result
+
+  def close(self):
+    if self.fp is not None:
+      self.fp.close()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 21/10/2026 5:30 pm
+# @Organisation: Veracode
+
+import json
+import sqlite3
+import time
+from datetime import timedelta, timezone
+
+from api_client import ApiError
+from constant import MIRROR, MIRROR_FULL_SYNC_AGE, MAX_PAGE_SIZE, \
+  profile_filename
+from filters import parse_api_date
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+  guid TEXT PRIMARY KEY,
+  name TEXT NOT NULL COLLATE NOCASE,
+  policy TEXT COLLATE NOCASE,
+  last_scan TEXT,
+  modified TEXT,
+  data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS applications_name ON applications (name);
+CREATE INDEX IF NOT EXISTS applications_last_scan ON applications (last_scan);
+CREATE INDEX IF NOT EXISTS applications_modified ON applications (modified);
+CREATE TABLE IF NOT EXISTS users (
+  user_id TEXT PRIMARY KEY,
+  email TEXT NOT NULL COLLATE NOCASE,
+  saml INTEGER,
+  enabled INTEGER,
+  data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_email ON users (email);
+CREATE TABLE IF NOT EXISTS policies (
+  guid TEXT PRIMARY KEY,
+  name TEXT COLLATE NOCASE,
+  data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+  entity TEXT PRIMARY KEY,
+  synced_at REAL NOT NULL,
+  pages TEXT,
+  full_synced_at REAL
+);
+"""
+ENTITIES = ('applications', 'users', 'policies')
+
+
+class MirrorMissing(Exception):
+  def __init__(self, profile):
+    super().__init__(f'No local mirror of "{profile}", '
+                     f'please run "pov sync" first.')
+
+
+class SyncResult:
+  """What one ``Mirror.sync`` call did for one entity."""
+
+  def __init__(self, entity, mode, fetched, total):
+    self.entity = entity
+    self.mode = mode  # full, delta or unchanged
+    self.fetched = fetched
+    self.total = total
+
+
+class Mirror:
+  """SQLite copy of one profile's applications, users and policies.
+
+  Filled by ``sync``: the first run crawls everything, later runs only
+  fetch what changed (see the ``sync_*`` methods). The query methods read
+  indexed columns and yield the raw API records, so list commands can
+  answer offline.
+  """
+
+  def __init__(self, profile, create=True):
+    path = MIRROR / f'{profile_filename(profile)}.sqlite3'
+    if not create and not path.exists():
+      raise MirrorMissing(profile)
+    MIRROR.mkdir(parents=True, exist_ok=True)
+    self.profile = profile
+    self.db = sqlite3.connect(path)
+    self.db.executescript(SCHEMA)
+    if {'pages', 'full_synced_at'} - {
+            column for _, column, *_ in
+            self.db.execute('PRAGMA table_info(sync_state)')}:
+      # older mirrors kept first-page ETags, which cannot vouch for later
+      # pages, and no full crawl time: start the bookkeeping over
+      self.db.executescript('DROP TABLE sync_state;' + SCHEMA)
+
+  def close(self):
+    self.db.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  def sync(self, client, entities=ENTITIES, full=False):
+    """Bring ``entities`` up to date through ``client``; yields SyncResult."""
+    for entity in entities:
+      yield getattr(self, 'sync_' + entity)(client, full)
+
+  def sync_applications(self, client, full=False):
+    """Applications changed since the newest ``modified`` in the mirror.
+
+    modified_after only takes a date, so the delta starts a day early and
+    upserts are idempotent. Deletions do not show up in a delta: when the
+    platform total no longer matches the mirror, or the last full crawl is
+    older than MIRROR_FULL_SYNC_AGE (a deletion and a creation leave the
+    total unchanged), one full crawl replaces the table.
+    """
+    url = client.api_url('/applications')
+    full_synced_at = self.db.execute(
+      'SELECT full_synced_at FROM sync_state WHERE entity = ?',
+      ('applications',)).fetchone()
+    if not full_synced_at or not full_synced_at[0] or \
+            time.time() - full_synced_at[0] > MIRROR_FULL_SYNC_AGE:
+      full = True
+    cursor = None if full else self.db.execute(
+      'SELECT MAX(modified) FROM applications').fetchone()[0]
+    if cursor is not None:
+      modified_after = parse_api_date(cursor).astimezone(timezone.utc) - \
+        timedelta(days=1)
+      delta = list(client.iter_pages(
+        url, 'applications',
+        params={'modified_after': modified_after.date().isoformat()},
+        page_size=MAX_PAGE_SIZE))
+      with self.db:
+        self._upsert_applications(delta)
+        self._mark_synced('applications')
+      if self.count('applications') == _total_elements(client, url):
+        return SyncResult('applications', 'delta', len(delta),
+                          self.count('applications'))
+
+    records = list(client.iter_pages(url, 'applications',
+                                     page_size=MAX_PAGE_SIZE))
+    with self.db:
+      self.db.execute('DELETE FROM applications')
+      self._upsert_applications(records)
+      self._mark_synced('applications', full=True)
+    return SyncResult('applications', 'full', len(records), len(records))
+
+  def sync_users(self, client, full=False):
+    """Detailed users, crawled again only when the listing changed.
+
+    The identity API has no modification filter, so every page is
+    requested again with its stored validators and a 304 on all of them
+    skips the crawl.
+    """
+    records, pages = self._crawl_if_changed(client, 'users',
+                                            client.admin_url('/users'),
+                                            'users', {'detailed': 'true'},
+                                            full)
+    if records is None:
+      return SyncResult('users', 'unchanged', 0, self.count('users'))
+    with self.db:
+      self.db.execute('DELETE FROM users')
+      self.db.executemany(
+        'INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?)',
+        [(user['user_id'], user['email_address'],
+          bool(user.get('saml_user')), bool(user.get('login_enabled')),
+          json.dumps(user)) for user in records])
+      self._mark_synced('users', pages, full=True)
+    return SyncResult('users', 'full', len(records), len(records))
+
+  def sync_policies(self, client, full=False):
+    """Policies, crawled again only when the listing changed."""
+    records, pages = self._crawl_if_changed(client, 'policies',
+                                            client.api_url('/policies'),
+                                            'policy_versions', None, full)
+    if records is None:
+      return SyncResult('policies', 'unchanged', 0, self.count('policies'))
+    with self.db:
+      self.db.execute('DELETE FROM policies')
+      self.db.executemany(
+        'INSERT OR REPLACE INTO policies VALUES (?, ?, ?)',
+        [(policy['guid'], policy['name'], json.dumps(policy))
+         for policy in records])
+      self._mark_synced('policies', pages, full=True)
+    return SyncResult('policies', 'full', len(records), len(records))
+
+  def _crawl_if_changed(self, client, entity, url, embedded_key, params,
+                        full):
+    """``(records, pages)`` of a listing and its page validators; records
+    is None if every page still matches the stored validators."""
+    row = None if full else self.db.execute(
+      'SELECT pages FROM sync_state WHERE entity = ?', (entity,)).fetchone()
+    pages = json.loads(row[0]) if row and row[0] else []
+    if pages and all(response.status_code == 304 for _, response in
+                     client.revalidate_pages(pages)):
+      with self.db:
+        self._mark_synced(entity, pages)
+      return None, pages
+    pages = []
+    records = list(client.iter_pages(url, embedded_key, params,
+                                     page_size=MAX_PAGE_SIZE,
+                                     validators=pages))
+    return records, pages
+
+  def _upsert_applications(self, records):
+    self.db.executemany(
+      'INSERT OR REPLACE INTO applications VALUES (?, ?, ?, ?, ?, ?)',
+      [(application['guid'], application['profile']['name'],
+        application['profile']['policies'][0]['name'],
+        application.get('last_completed_scan_date'),
+        application.get('modified'), json.dumps(application))
+       for application in records])
+
+  def _mark_synced(self, entity, pages=None, full=False):
+    now = time.time()
+    self.db.execute(
+      'INSERT INTO sync_state VALUES (?, ?, ?, ?) ON CONFLICT (entity) '
+      'DO UPDATE SET synced_at = excluded.synced_at, pages = excluded.pages, '
+      'full_synced_at = COALESCE(excluded.full_synced_at, full_synced_at)',
+      (entity, now, pages and json.dumps(pages), now if full else None))
+
+  def count(self, entity):
+    return self.db.execute(f'SELECT COUNT(*) FROM {entity}').fetchone()[0]
+
+  def synced_at(self, entity):
+    row = self.db.execute('SELECT synced_at FROM sync_state WHERE entity = ?',
+                          (entity,)).fetchone()
+    return row and row[0]
+
+  def applications(self, name=None, policy=None, scanned_since=None,
+                   modified_since=None):
+    """Raw application records, filtered like ``application_filter``."""
+    clauses, args = [], []
+    if name:
+      clauses.append("name LIKE ? ESCAPE '\\'")
+      args.append(f'%{_escape_like(name)}%')
+    if policy:
+      clauses.append('policy = ?')
+      args.append(policy)
+    for column, moment in (('last_scan', scanned_since),
+                           ('modified', modified_since)):
+      if moment is not None:
+        clauses.append(f'{column} >= ?')
+        args.append(_api_timestamp(moment))
+    return self._query('applications', clauses, args, 'name')
+
+  def users(self, email=None, saml=None, enabled=None):
+    """Raw detailed user records, filtered like ``user_filter``."""
+    clauses, args = [], []
+    if email:
+      clauses.append("email LIKE ? ESCAPE '\\'")
+      args.append(f'%{_escape_like(email)}%')
+    for column, value in (('saml', saml), ('enabled', enabled)):
+      if value is not None:
+        clauses.append(f'{column} = ?')
+        args.append(value)
+    return self._query('users', clauses, args, 'email')
+
+  def _query(self, table, clauses, args, order_by):
+    where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+    for data, in self.db.execute(
+            f'SELECT data FROM {table}{where} ORDER BY {order_by}', args):
+      yield json.loads(data)
+
+
+def iter_mirror_rows(profiles, query):
+  """``(profile, item, error)`` rows of ``query(mirror)`` for every profile,
+  in the shape ``echo_profile_rows`` takes."""
+  for profile in profiles:
+    try:
+      with Mirror(profile, create=False) as mirror:
+        for item in query(mirror):
+          yield profile, item, None
+    except (MirrorMissing, sqlite3.Error) as e:
+      yield profile, None, e
+
+
+def _total_elements(client, url):
+  response = client.get(url, params={'size': 1})
+  if not response.ok:
+    raise ApiError(response)
+  return response.json()['page']['total_elements']
+
+
+def _api_timestamp(moment):
+  """``moment`` (naive is local time) in the API's sortable UTC format."""
+  return moment.astimezone(timezone.utc).strftime(
+    '%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _escape_like(text):
+  return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 21/10/2026 11:35 am
+# @Organisation: Veracode
+
+import csv
+import json
+import sys
+import time
+
+import click
+
+OUTPUT_FORMATS = ['table', 'csv', 'jsonl', 'json']
+
+
+def output_option(command):
+  return click.option('-o', '--output', type=click.Choice(OUTPUT_FORMATS),
+                      default='table', show_default=True,
+                      help='Output format; csv, jsonl and json are written '
+                           'incrementally and meant for piping')(command)
+
+
+class RowWriter:
+  """Incremental, buffered writer for list command output.
+
+  ``table`` takes preformatted lines via ``write_line``; ``csv``, ``jsonl``
+  and ``json`` (one streamed array) take dict rows via ``write_row``.
+  Nothing is flushed per row: stdout is flushed at most every
+  ``flush_interval`` seconds, so piped output arrives page by page instead
+  of line by line or only at exit.
+  """
+
+  def __init__(self, output, fieldnames=(), stream=None, flush_interval=0.5):
+    self.output = output
+    self.stream = stream or sys.stdout
+    self.flush_interval = flush_interval
+    self.flushed = time.monotonic()
+    self.rows = 0
+    self.csv_writer = None
+    if output == 'csv':
+      self.csv_writer = csv.DictWriter(self.stream, fieldnames=fieldnames,
+                                       lineterminator='\n')
+      self.csv_writer.writeheader()
+    elif output == 'json':
+      self.stream.write('[')
+
+  def write_line(self, line):
+    self.stream.write(line + '\n')
+    self._maybe_flush()
+
+  def write_row(self, row):
+    if self.output == 'csv':
+      self.csv_writer.writerow(row)
+    elif self.output == 'json':
+      self.stream.write((',\n' if self.rows else '\n') + json.dumps(row))
+    else:
+      self.stream.write(json.dumps(row) + '\n')
+    self.rows += 1
+    self._maybe_flush()
+
+  def close(self):
+    if self.output == 'json':
+      self.stream.write('\n]\n' if self.rows else ']\n')
+    self.stream.flush()
+
+  def _maybe_flush(self):
+    now = time.monotonic()
+    if now - self.flushed >= self.flush_interval:
+      self.stream.flush()
+      self.flushed = now
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 22/10/2026 2:20 pm
+# @Organisation: Veracode
+
+import copy
+import json
+
+
+class PayloadTemplate:
+  """JSON request body serialized once, with per-item fields substituted.
+
+  ``fields`` maps a field name to its key path in ``body``. The body is
+  copied and dumped a single time with a placeholder at every path;
+  ``render`` then joins the constant fragments with the JSON encoding of
+  each value, so building a payload never copies or walks the template.
+  """
+
+  def __init__(self, body, fields):
+    body = copy.deepcopy(body)
+    placeholders = {}
+    for field, path in fields.items():
+      placeholder = f'\0{field}\0'
+      placeholders[json.dumps(placeholder)] = field
+      target = body
+      for key in path[:-1]:
+        target = target[key]
+      target[path[-1]] = placeholder
+
+    text = json.dumps(body)
+    self.fragments, self.fields = [], []
+    start = 0
+    for position, field in sorted(
+            (text.index(encoded), field)
+            for encoded, field in placeholders.items()):
+      self.fragments.append(text[start:position])
+      self.fields.append(field)
+      start = position + len(json.dumps(f'\0{field}\0'))
+    self.fragments.append(text[start:])
+
+  def render(self, **values):
+    dumps = json.dumps
+    parts = [self.fragments[0]]
+    for field, fragment in zip(self.fields, self.fragments[1:]):
+      parts.append(dumps(values[field]))
+      parts.append(fragment)
+    return ''.join(parts)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 22/10/2026 10:05 am
+# @Organisation: Veracode
+
+import bisect
+import re
+
+import click
+
+DEFAULT_PICKER_PAGE_SIZE = 20
+_KEY_UP = ('\x1b[A', '\x1bOA')
+_KEY_DOWN = ('\x1b[B', '\x1bOB')
+_KEY_PAGE_UP = ('\x1b[5~', '\x1b[D', '\x1bOD')
+_KEY_PAGE_DOWN = ('\x1b[6~', '\x1b[C', '\x1bOC')
+_KEY_BACKSPACE = ('\x7f', '\x08')
+_KEY_TOGGLE = '\t'
+_KEY_SELECT_ALL = '\x01'  # Ctrl-A
+_KEY_CANCEL = '\x1b'
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+class SearchIndex:
+  """In-memory search over the text of a list of items.
+
+  Every word of every text (and the whole text) is kept in one sorted
+  list, so prefix matches are a bisect away. Queries that no word starts
+  with fall back to a fuzzy subsequence match ("pap12" finds "PoV
+  Application 00012"); fuzzy matches are never mixed into prefix matches,
+  so "select all matches" stays predictable. A fuzzy result is
+  remembered: a query that extends it only scans within it, which is the
+  common case while typing.
+  """
+
+  def __init__(self, items, text):
+    self.items = list(items)
+    self.texts = [text(item).lower() for item in self.items]
+    self.tokens = sorted({(token, idx)
+                          for idx, value in enumerate(self.texts)
+                          for token in [value] + _WORD.findall(value)})
+    self.fuzzy_query = None
+    self.fuzzy_result = None
+
+  def search(self, query):
+    """Item indexes matching ``query``: the items with a word starting
+    with it in list order, else fuzzy matches, tightest span first."""
+    query = query.lower().strip()
+    if not query:
+      return list(range(len(self.items)))
+    prefixed = set()
+    start = bisect.bisect_left(self.tokens, (query, -1))
+    for token, idx in self.tokens[start:]:
+      if not token.startswith(query):
+        break
+      prefixed.add(idx)
+    if prefixed:
+      return sorted(prefixed)
+
+    # every fuzzy match of a query is a fuzzy match of its prefixes
+    candidates = range(len(self.items))
+    if self.fuzzy_query is not None and query.startswith(self.fuzzy_query):
+      candidates = self.fuzzy_result
+    scored = []
+    for idx in candidates:
+      span = _subsequence_span(query, self.texts[idx])
+      if span is not None:
+        scored.append((span, idx))
+    self.fuzzy_query = query
+    self.fuzzy_result = [idx for _, idx in sorted(scored)]
+    return self.fuzzy_result
+
+
+def _subsequence_span(query, text):
+  """Length of the shortest-from-the-left span of ``text`` containing the
+  characters of ``query`` in order, or None."""
+  start = position = text.find(query[0])
+  if start < 0:
+    return None
+  for char in query[1:]:
+    position = text.find(char, position + 1)
+    if position < 0:
+      return None
+  return position - start + 1
+
+
+class Picker:
+  """Paged, searchable multi-select list on the terminal.
+
+  Typing filters the list through a SearchIndex; Up/Down move, Tab
+  toggles the row under the cursor, Ctrl-A toggles every match,
+  PgUp/PgDn (or Left/Right) change page, Enter confirms and Esc cancels.
+  Only the current page is drawn, so redraws stay small however long the
+  list is.
+  """
+
+  def __init__(self, items, text, format_row, header=(),
+               page_size=DEFAULT_PICKER_PAGE_SIZE):
+    self.index = SearchIndex(items, text)
+    self.format_row = format_row
+    self.header = header
+    self.page_size = page_size
+    self.query = ''
+    self.matches = self.index.search('')
+    self.cursor = 0
+    self.selected = set()
+
+  def run(self):
+    """Selected items in list order, or an empty list if cancelled."""
+    while True:
+      self.draw()
+      key = click.getchar()
+      if key in ('\r', '\n'):
+        return [self.index.items[idx] for idx in sorted(self.selected)]
+      if key == _KEY_CANCEL:
+        return []
+      self.handle(key)
+
+  def handle(self, key):
+    if key in _KEY_UP:
+      self.move(-1)
+    elif key in _KEY_DOWN:
+      self.move(1)
+    elif key in _KEY_PAGE_UP:
+      self.move(-self.page_size)
+    elif key in _KEY_PAGE_DOWN:
+      self.move(self.page_size)
+    elif key == _KEY_TOGGLE and self.matches:
+      self.selected ^= {self.matches[self.cursor]}
+    elif key == _KEY_SELECT_ALL:
+      matches = set(self.matches)
+      if matches <= self.selected:
+        self.selected -= matches
+      else:
+        self.selected |= matches
+    elif key in _KEY_BACKSPACE:
+      self.search(self.query[:-1])
+    elif key.isprintable():
+      self.search(self.query + key)
+
+  def move(self, rows):
+    """Move the cursor by ``rows``, staying on a match (or at 0 if none)."""
+    self.cursor = max(0, min(len(self.matches) - 1, self.cursor + rows))
+
+  def search(self, query):
+    self.query = query
+    self.matches = self.index.search(query)
+    self.cursor = 0
+
+  def draw(self):
+    page = self.cursor // self.page_size
+    pages = max(1, -(-len(self.matches) // self.page_size))
+    first = page * self.page_size
+    lines = [f'Search: {self.query}', '']
+    lines.extend('      ' + line for line in self.header)
+    for position in range(first, min(first + self.page_size,
+                                     len(self.matches))):
+      idx = self.matches[position]
+      lines.append(
+        ('> ' if position == self.cursor else '  ') +
+        ('[x] ' if idx in self.selected else '[ ] ') +
+        self.format_row(idx + 1, self.index.items[idx]))
+    lines.append('')
+    lines.append(f'Page {page + 1}/{pages}, {len(self.matches)} matches, '
+                 f'{len(self.selected)} selected. Tab: select, '
+                 f'Ctrl-A: select matches, Enter: done, Esc: cancel')
+    click.clear()
+    click.echo('\n'.join(lines))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 23/10/2026 10:40 am
+# @Organisation: Veracode
+
+import statistics
+import sys
+import time
+from collections import Counter
+from itertools import chain
+
+import click
+import requests
+from api_client import ApiError
+from stats import endpoint_of
+
+DEFAULT_LATENCY_PROBES = 3
+DISPLAY_CALLS_FMT = "{:48} {:>8}"
+
+
+class CallPlan:
+  """The API calls a bulk command would send, counted per endpoint.
+
+  Reads are listing pages and lookups, made one after the other before
+  anything changes; writes are the mutating calls, sent through the worker
+  pool and the shared rate limiter. Listings are counted as a full crawl,
+  as if the local cache were cold.
+  """
+
+  def __init__(self):
+    self.reads = Counter()
+    self.writes = Counter()
+
+  def add_listing(self, url, records, page_size):
+    self.reads[endpoint_of('GET', url)] += max(1, -(-records // page_size))
+
+  def add_read(self, url):
+    self.reads[endpoint_of('GET', url)] += 1
+
+  def add_requests(self, items, build_request):
+    """One write per item, keyed like the ``run_bulk`` request it builds."""
+    for item in items:
+      method, url, _ = build_request(item)
+      self.writes[endpoint_of(method, url)] += 1
+
+  def total(self):
+    return sum(self.reads.values()) + sum(self.writes.values())
+
+  def estimate(self, latency, concurrency, rate):
+    """Seconds the calls take at ``latency`` per call: reads in sequence,
+    then writes bound by the pool or the rate limit, whichever is slower."""
+    writes = sum(self.writes.values())
+    return sum(self.reads.values()) * latency + \
+        max(writes * latency / concurrency, writes / rate)
+
+
+def probe_latency(client, probes=DEFAULT_LATENCY_PROBES):
+  """Median seconds of ``probes`` one-record listing requests, alternating
+  between the applications and identity APIs."""
+  urls = [client.api_url('/applications'), client.admin_url('/users')]
+  timings = []
+  for idx in range(probes):
+    started = time.monotonic()
+    response = client.get(urls[idx % len(urls)], params={'size': 1})
+    timings.append(time.monotonic() - started)
+    if not response.ok:
+      raise ApiError(response)
+  return statistics.median(timings)
+
+
+def print_call_plan(plan, client, concurrency=None):
+  """Print the calls of ``plan`` per endpoint and the estimated wall time,
+  measured against the live API with a few read-only probes."""
+  concurrency = concurrency or client.concurrency
+  rate = client.rate_limiter.max_rate
+  try:
+    latency = probe_latency(client)
+  except requests.RequestException as e:
+    click.echo("Whoops!")
+    click.echo(e)
+    sys.exit(1)
+  except ApiError as e:
+    click.secho(str(e), fg='red')
+    sys.exit(1)
+
+  click.echo(DISPLAY_CALLS_FMT.format('Endpoint', 'Calls'))
+  click.echo(DISPLAY_CALLS_FMT.format('-' * 48, '-' * 8))
+  for endpoint, calls in chain(sorted(plan.reads.items()),
+                               sorted(plan.writes.items())):
+    click.echo(DISPLAY_CALLS_FMT.format(endpoint, calls))
+  click.echo(DISPLAY_CALLS_FMT.format('Total', plan.total()))
+  click.echo(f'Estimated wall time: '
+             f'{plan.estimate(latency, concurrency, rate):.1f}s '
+             f'(median latency {latency * 1000:.0f} ms over '
+             f'{DEFAULT_LATENCY_PROBES} probes, concurrency {concurrency}, '
+             f'rate limit {rate:g} req/s).')
+  click.secho('Dry run: nothing was changed.', fg='yellow')
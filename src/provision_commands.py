@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 20/10/2026 9:30 am
+# @Organisation: Veracode
+
+import os.path
+import sys
+from itertools import chain, zip_longest
+
+import click
+import requests
+from constant import DISPLAY_PLAN_FMT, PIPELINE_QUEUE_SIZE
+from application_commands import Application, diff_applications, \
+  fetch_applications, iter_platform_applications, \
+  create_application_request, delete_application_request
+from user_commands import User, diff_users, fetch_users, \
+  iter_platform_users, fetch_self_user_id, select_users, \
+  create_user_request, delete_user_request
+from bulk import run_bulk, print_bulk_summary, merge_streams
+from inventory import iter_applications, iter_users, \
+  check_applications, check_users
+from journal import ProvisioningJournal
+from api_client import activated_client, ApiError
+from planner import CallPlan, print_call_plan
+
+
+@click.command('init')
+@click.pass_context
+@click.option('-e', '--init-excel',
+              help='Inventory workbook (.xlsx) with the application sheet '
+                   'first and the user sheet second')
+@click.option('-a', '--applications-file',
+              help='Application sheet as .xlsx, .csv or .jsonl '
+                   '(overrides the workbook)')
+@click.option('-u', '--users-file',
+              help='User sheet as .xlsx, .csv or .jsonl '
+                   '(overrides the workbook)')
+@click.option('-c', '--concurrency', type=click.IntRange(min=1),
+              help='Number of applications/users to create in parallel')
+@click.option('-r', '--resume', is_flag=True,
+              help='Only send the items a previous run did not create')
+@click.option('--plan', is_flag=True,
+              help='Show how many items would be created or skipped, '
+                   'then exit without creating anything')
+@click.option('--refresh', is_flag=True,
+              help='Ignore the local listing cache when checking which '
+                   'items already exist')
+@click.option('--dry-run', is_flag=True,
+              help='Like --plan, and also count the API calls per endpoint and '
+                   'estimate how long they take')
+@click.option('-y', '--yes', is_flag=True,
+              help='Do not ask for confirmation')
+def initialise(ctx, init_excel, applications_file, users_file, concurrency,
+               resume, plan, refresh, dry_run, yes):
+  """Initialise PoV assets including Applications and Users
+
+  Rows are created while the inventory is still being parsed, applications
+  and users side by side.
+  """
+  if not init_excel and not (applications_file and users_file):
+    init_excel = click.prompt('Init excel')
+  applications_file = applications_file or init_excel
+  users_file = users_file or init_excel
+  for path in {applications_file, users_file}:
+    if not os.path.exists(path):
+      click.secho(f'Cannot locate file {path}.')
+      sys.exit(1)
+  # rows are only parsed once creation is under way: refuse malformed
+  # sheets up front
+  check_applications(applications_file)
+  check_users(users_file)
+
+  config = ctx.obj['config']
+  if not config.sections():
+    click.secho(
+      'You have not configured Veracode API credentials, '
+      'please run \"pov credentials add\" command before running this command.')
+    sys.exit(1)
+
+  client = activated_client(ctx)
+  if plan or dry_run:
+    platform_applications = list(fetch_applications(
+      client, refresh=refresh, revalidate=True))
+    platform_users = list(fetch_users(client, refresh=refresh,
+                                      revalidate=True))
+    application_list, present_applications = diff_applications(
+      list(iter_applications(applications_file)), client,
+      platform_applications=platform_applications)
+    user_list, present_users = diff_users(
+      list(iter_users(users_file)), client, platform_users=platform_users)
+    click.echo(DISPLAY_PLAN_FMT.format('', 'Create', 'Already present'))
+    click.echo(DISPLAY_PLAN_FMT.format('-' * 12, '-' * 8, '-' * 16))
+    click.echo(DISPLAY_PLAN_FMT.format('Applications', len(application_list),
+                                       len(present_applications)))
+    click.echo(DISPLAY_PLAN_FMT.format('Users', len(user_list),
+                                       len(present_users)))
+    if dry_run:
+      journal = ProvisioningJournal(client.profile, resume=resume,
+                                    read_only=True)
+      application_list, skipped_applications = journal.remaining(
+        'application', application_list,
+        lambda application: application.application_name)
+      user_list, skipped_users = journal.remaining('user', user_list,
+                                                   lambda user: user.email)
+      if skipped_applications or skipped_users:
+        click.echo(f'Skipping {skipped_applications} applications and '
+                   f'{skipped_users} users created by a previous run.')
+      call_plan = CallPlan()
+      call_plan.add_listing(client.api_url('/applications'),
+                            len(platform_applications), client.page_size)
+      call_plan.add_listing(client.admin_url('/users'), len(platform_users),
+                            client.page_size)
+      call_plan.add_requests(application_list,
+                             lambda application: create_application_request(
+                               client, application))
+      call_plan.add_requests(user_list,
+                             lambda user: create_user_request(client, user))
+      click.echo()
+      print_call_plan(call_plan, client, concurrency)
+    return
+
+  # rows stream into creation as they are parsed, so the totals are only
+  # known at the end: confirm up front, "--plan" gives the counts
+  if not yes and not click.confirm(
+          f'Create the applications and users of '
+          f'{", ".join(sorted({applications_file, users_file}))} in '
+          f'"{client.profile}", continue?'):
+    sys.exit(0)
+
+  journal = ProvisioningJournal(client.profile, resume=resume)
+  applications = InsertStream(
+    'application', lambda application: application.application_name,
+    lambda: iter_platform_applications(client, refresh=refresh,
+                                       revalidate=True), journal)
+  users = InsertStream(
+    'user', lambda user: user.email,
+    lambda: iter_platform_users(client, refresh=refresh, revalidate=True),
+    journal)
+  streams = {Application: applications, User: users}
+
+  def label(item):
+    return streams[type(item)].key(item)
+
+  def build_request(item):
+    if isinstance(item, Application):
+      return create_application_request(client, item)
+    return create_user_request(client, item)
+
+  recorders = {Application: journal.recorder('application', label, 'guid'),
+               User: journal.recorder('user', label, 'user_id')}
+
+  def on_result(item, response, reason):
+    recorders[type(item)](item, response, reason)
+
+  # parsing, the existing-item listings and creation all overlap: both
+  # sheets feed one bounded stream, drained by a single worker pool
+  try:
+    result = run_bulk(client, merge_streams(
+      [applications.inserts(iter_applications(applications_file)),
+       users.inserts(iter_users(users_file))], PIPELINE_QUEUE_SIZE),
+      build_request,
+      label=label,
+      progress_label='Adding',
+      concurrency=concurrency,
+      on_result=on_result)
+  except requests.RequestException as e:
+    click.echo("Whoops!")
+    click.echo(e)
+    sys.exit(1)
+  except ApiError as e:
+    click.secho(str(e), fg='red')
+    sys.exit(1)
+  finally:
+    journal.close()
+
+  created = {Application: [], User: []}
+  for item, response in result.succeeded:
+    created[type(item)].append(response.json())
+  click.echo(DISPLAY_PLAN_FMT.format('', 'Created', 'Already present'))
+  click.echo(DISPLAY_PLAN_FMT.format('-' * 12, '-' * 8, '-' * 16))
+  click.echo(DISPLAY_PLAN_FMT.format('Applications',
+                                     len(created[Application]),
+                                     applications.present))
+  click.echo(DISPLAY_PLAN_FMT.format('Users', len(created[User]),
+                                     users.present))
+  for stream in streams.values():
+    if stream.resumed:
+      click.echo(f'Skipped {stream.resumed} {stream.kind}s created by a '
+                 f'previous run.')
+  print_bulk_summary(result, label, 'applications and users', 'created')
+  client.update_cache('applications', 'guid', upserts=created[Application])
+  client.update_cache('users', 'user_id', upserts=created[User])
+  if result.failed:
+    sys.exit(1)
+
+
+class InsertStream:
+  """Filters one kind of parsed rows down to true inserts, as they come.
+
+  ``inserts`` drops rows whose ``key`` already exists on the platform (case
+  insensitively, fetched once through ``existing``), repeats of an earlier
+  row and, with a resumed journal, rows a previous run created; it counts
+  what it drops in ``present`` and ``resumed``.
+  """
+
+  def __init__(self, kind, key, existing, journal):
+    self.kind = kind
+    self.key = key
+    self.existing = existing
+    self.journal = journal
+    self.present = 0
+    self.resumed = 0
+
+  def inserts(self, rows):
+    # keep parsing in the background while the listing is fetched
+    rows = merge_streams([rows], PIPELINE_QUEUE_SIZE)
+    seen = {self.key(item).lower() for item in self.existing()}
+    for item in rows:
+      key = self.key(item)
+      if key.lower() in seen:
+        self.present += 1
+        continue
+      seen.add(key.lower())
+      if self.journal.is_created(self.kind, key):
+        self.resumed += 1
+        continue
+      yield item
+
+
+@click.command()
+@click.pass_context
+@click.option('-y', '--yes', is_flag=True,
+              help='Do not ask for confirmation')
+@click.option('-c', '--concurrency', type=click.IntRange(min=1),
+              help='Number of applications/users to delete in parallel')
+@click.option('--dry-run', is_flag=True,
+              help='Count the API calls per endpoint and estimate how long '
+                   'they take, then exit without removing anything')
+def teardown(ctx, yes, concurrency, dry_run):
+  """Remove all Applications and Users from the PoV account"""
+  config = ctx.obj['config']
+  if not config.sections():
+    click.secho(
+      'You have not configured Veracode API credentials, '
+      'please run \"pov credentials add\" command before running this command.')
+    sys.exit(1)
+
+  client = activated_client(ctx)
+  application_list = list(fetch_applications(client, refresh=True))
+  platform_users = list(fetch_users(client, refresh=True))
+  user_list = select_users(platform_users, select_all=True,
+                           exclude_user_id=fetch_self_user_id(client))
+  if not application_list and not user_list:
+    click.secho('Nothing to remove.', fg='yellow')
+    return
+  if dry_run:
+    click.echo(f'Would remove {len(application_list)} applications and '
+               f'{len(user_list)} users from "{client.profile}".')
+    call_plan = CallPlan()
+    call_plan.add_listing(client.api_url('/applications'),
+                          len(application_list), client.page_size)
+    call_plan.add_listing(client.admin_url('/users'), len(platform_users),
+                          client.page_size)
+    call_plan.add_read(client.admin_url('/users/self'))
+    call_plan.add_requests(application_list,
+                           lambda application: delete_application_request(
+                             client, application))
+    call_plan.add_requests(user_list,
+                           lambda user: delete_user_request(client, user))
+    print_call_plan(call_plan, client, concurrency)
+    return
+  if not yes and not click.confirm(
+          f'Remove {len(application_list)} applications and '
+          f'{len(user_list)} users from '
+          f'"{client.profile}", continue?'):
+    sys.exit(0)
+
+  def label(item):
+    return item.application_name if isinstance(item, Application) \
+      else item.email
+
+  def build_request(item):
+    if isinstance(item, Application):
+      return delete_application_request(client, item)
+    return delete_user_request(client, item)
+
+  # interleave both kinds so they are removed side by side in one pool
+  items = [item for item in chain.from_iterable(
+    zip_longest(application_list, user_list)) if item is not None]
+  result = run_bulk(client, items, build_request,
+                    label=label,
+                    progress_label='Removing',
+                    concurrency=concurrency)
+  removed_applications = [item for item, _ in result.succeeded
+                          if isinstance(item, Application)]
+  removed_users = [item for item, _ in result.succeeded
+                   if not isinstance(item, Application)]
+  print_bulk_summary(result, label, 'applications and users', 'removed')
+  click.echo(f'Removed {len(removed_applications)} applications and '
+             f'{len(removed_users)} users.')
+  client.update_cache('applications', 'guid',
+                      removals=[application.application_guid
+                                for application in removed_applications])
+  client.update_cache('users', 'user_id',
+                      removals=[user.user_id for user in removed_users])
+  if result.failed:
+    sys.exit(1)
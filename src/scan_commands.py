@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 21/10/2026 2:40 pm
+# @Organisation: Veracode
+
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import click
+import requests
+from constant import SCAN_LOGS, DEFAULT_SCAN_JOBS, DEFAULT_SCAN_TIMEOUT, \
+  DEFAULT_WATCH_INTERVAL, DEFAULT_WATCH_MAX_INTERVAL, MAX_PAGE_SIZE
+from api_client import activated_client, ApiError
+from application_commands import iter_platform_applications
+from filters import parse_api_date
+from inventory import iter_scan_jobs
+from output import output_option, RowWriter
+from scan_pool import run_scan_jobs
+
+DISPLAY_SCAN_FMT = "{:<3} {:30} {:20} {:8} {:>5} {:>9}  {}"
+DISPLAY_SCAN_EVENT_FMT = "{:19}  {:40} {}"
+SCAN_EVENT_FIELDS = ('observed_at', 'application', 'guid', 'last_scan')
+
+
+@click.group(invoke_without_command=True)
+@click.pass_context
+def scan(ctx):
+  """Kick Off Veracode Scans by Java Wrapper
+
+  Without a subcommand, one scan is set up interactively.
+  """
+  config = ctx.obj['config']
+  if not config.sections():
+    click.secho(
+      'You have not configured Veracode API credentials, '
+      'please run \"pov credentials add\" command before running this command.')
+    sys.exit(1)
+  if ctx.invoked_subcommand is not None:
+    return
+
+  java_wrapper_path = click.prompt(
+    'Please paste the absolution path for Java Wrapper').strip()
+  app_name = click.prompt(
+    'Please paste the Application Name for the scan').strip()
+  create_profile = 'true' if click.confirm(
+    'Do you want to create this profile (if not exist)?') else 'false'
+  file_path = click.prompt(
+    'Please paste the full absolute path for the artifact to scan').strip()
+  scan_name = click.prompt('Please enter the scan name').strip()
+
+  cmd = ['java', '-jar', java_wrapper_path, '-action',
+         'UploadAndScan', '-appname', app_name, '-createprofile',
+         create_profile, '-filepath', file_path, '-version', scan_name]
+  p = subprocess.Popen(cmd)
+  p.communicate()
+
+
+def print_scan_jobs(jobs):
+  click.echo(DISPLAY_SCAN_FMT.format("ID", "Application", "Version",
+                                     "Status", "Exit", "Duration", "Log"))
+  click.echo(DISPLAY_SCAN_FMT.format("-" * 3, "-" * 30, "-" * 20, "-" * 8,
+                                     "-" * 5, "-" * 9, "-" * 20))
+  for idx, job in enumerate(jobs, start=1):
+    click.secho(DISPLAY_SCAN_FMT.format(
+      idx, job.application_name[:30], job.version[:20], job.status,
+      '' if job.returncode is None else job.returncode,
+      f'{job.duration:.1f}s', job.log_path or ''),
+      fg=None if job.status == 'ok' else 'red')
+    if job.message:
+      click.secho(f'    {job.message}', fg='red')
+
+
+@scan.command('batch')
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False))
+@click.option('-w', '--java-wrapper', envvar='VERACODE_JAVA_WRAPPER',
+              prompt='Please paste the absolution path for Java Wrapper',
+              help='Path of the Veracode Java API wrapper jar')
+@click.option('--create-profile', is_flag=True,
+              help='Create application profiles that do not exist yet')
+@click.option('-j', '--jobs', default=DEFAULT_SCAN_JOBS, show_default=True,
+              type=click.IntRange(min=1),
+              help='Number of wrapper processes to run at once')
+@click.option('--timeout', default=DEFAULT_SCAN_TIMEOUT, show_default=True,
+              type=click.IntRange(min=1),
+              help='Seconds before a wrapper invocation is killed')
+@click.option('--log-dir', type=click.Path(file_okay=False),
+              help='Directory for the per-scan logs '
+                   '(default: a new directory under ~/.veracode/scan-logs)')
+@click.option('--java', default='java', show_default=True,
+              help='Java executable used to run the wrapper')
+def batch_scan(manifest, java_wrapper, create_profile, jobs, timeout, log_dir,
+               java):
+  """Run the scans listed in a manifest in parallel
+
+  MANIFEST is a .csv, .json or .jsonl file, or the inventory workbook
+  (third sheet), with Application Name, Artifact Path and Version columns.
+  """
+  scan_jobs = list(iter_scan_jobs(manifest))
+  if not scan_jobs:
+    click.secho(f'No scans found in {manifest}.', fg='yellow')
+    return
+  log_dir = Path(log_dir) if log_dir else \
+    SCAN_LOGS / time.strftime('%Y%m%d-%H%M%S')
+
+  click.echo(f'Running {len(scan_jobs)} scans, {jobs} at a time; '
+             f'logs in {log_dir}')
+  with click.progressbar(
+          length=len(scan_jobs),
+          show_eta=True,
+          item_show_func=lambda job: f"{job.application_name}: {job.status}"
+          if job else None
+  ) as bar:
+    for job in run_scan_jobs(scan_jobs, java_wrapper, log_dir,
+                             create_profile, jobs, timeout, java):
+      bar.update(1, job)
+
+  print_scan_jobs(scan_jobs)
+  failed = [job for job in scan_jobs if job.status != 'ok']
+  click.secho(f'{len(scan_jobs) - len(failed)} of {len(scan_jobs)} scans '
+              f'submitted successfully.', fg='red' if failed else 'green')
+  if failed:
+    sys.exit(1)
+
+
+def watch_scans(client, names, since=None, interval=DEFAULT_WATCH_INTERVAL,
+                max_interval=DEFAULT_WATCH_MAX_INTERVAL, deadline=None):
+  """Yield applications of ``names`` as a new scan of theirs completes.
+
+  Every poll is one conditional listing of all applications (a 304 when
+  nothing changed on the platform), never a request per application. A
+  scan counts as completed when last_completed_scan_date moves past the
+  value seen on the first poll, or reaches ``since`` when given. The poll
+  interval starts at ``interval``, grows by half after each quiet poll up
+  to ``max_interval`` and drops back once a scan completes. Stops when
+  every application completed or at the monotonic ``deadline``.
+  """
+  pending = {name.lower(): name for name in names}
+  baseline = {}
+  delay = interval
+  first_poll = True
+  while pending:
+    latest = {}
+    for application in iter_platform_applications(
+            client, page_size=MAX_PAGE_SIZE, revalidate=True):
+      if application.application_name.lower() in pending:
+        latest[application.application_name.lower()] = application
+
+    completed = False
+    for key in list(pending):
+      application = latest.get(key)
+      scanned = None if application is None else \
+        parse_api_date(application.last_scan)
+      if since is not None:
+        done = scanned is not None and scanned >= since
+      elif first_poll:
+        baseline[key] = scanned
+        done = False
+      else:
+        done = scanned is not None and \
+               (baseline[key] is None or scanned > baseline[key])
+      if done:
+        del pending[key]
+        completed = True
+        yield application
+
+    if first_poll:
+      missing = [pending[key] for key in pending if key not in latest]
+      if missing:
+        click.secho(f'Not on the platform yet: {", ".join(missing)}',
+                    fg='yellow', err=True)
+      first_poll = False
+    delay = interval if completed else min(max_interval, delay * 1.5)
+    if not pending:
+      return
+    if deadline is not None:
+      remaining = deadline - time.monotonic()
+      if remaining <= 0:
+        return
+      delay = min(delay, remaining)
+    time.sleep(delay)
+
+
+@scan.command('watch')
+@click.pass_context
+@click.option('-n', '--name', 'names', multiple=True,
+              help='Application to watch (repeatable)')
+@click.option('-m', '--manifest',
+              type=click.Path(exists=True, dir_okay=False),
+              help='Watch every application of a scan batch manifest')
+@click.option('--since', type=click.DateTime(),
+              help='Count scans completed since this local time, instead of '
+                   'only scans completing after the watch starts')
+@click.option('--interval', default=DEFAULT_WATCH_INTERVAL, show_default=True,
+              type=click.FloatRange(min=1),
+              help='Seconds between polls while scans are completing')
+@click.option('--max-interval', default=DEFAULT_WATCH_MAX_INTERVAL,
+              show_default=True, type=click.FloatRange(min=1),
+              help='Longest wait between polls when nothing changes')
+@click.option('--timeout', type=click.IntRange(min=1),
+              help='Give up after this many seconds')
+@output_option
+def watch_scans_command(ctx, names, manifest, since, interval, max_interval,
+                        timeout, output):
+  """Wait for scans of applications to complete
+
+  Prints one event per application as its scan completes and exits once
+  all have completed (exit code 1 on --timeout).
+  """
+  names = list(names)
+  if manifest:
+    names.extend(job.application_name for job in iter_scan_jobs(manifest))
+  names = list(dict.fromkeys(names))
+  if not names:
+    raise click.UsageError('Pass --name or --manifest.')
+  client = activated_client(ctx)
+  since = since.astimezone() if since else None
+  deadline = time.monotonic() + timeout if timeout else None
+
+  completed = 0
+  with RowWriter(output, SCAN_EVENT_FIELDS, flush_interval=0) as writer:
+    if output == 'table':
+      writer.write_line(DISPLAY_SCAN_EVENT_FMT.format(
+        'Observed', 'Application', 'Last Scan'))
+      writer.write_line(DISPLAY_SCAN_EVENT_FMT.format('-' * 19, '-' * 40,
+                                                      '-' * 25))
+    try:
+      for application in watch_scans(client, names, since,
+                                     min(interval, max_interval),
+                                     max_interval, deadline):
+        completed += 1
+        observed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if output == 'table':
+          writer.write_line(DISPLAY_SCAN_EVENT_FMT.format(
+            observed_at, application.application_name,
+            application.last_scan))
+        else:
+          writer.write_row({'observed_at': observed_at,
+                            'application': application.application_name,
+                            'guid': application.application_guid,
+                            'last_scan': application.last_scan})
+    except requests.RequestException as e:
+      click.echo("Whoops!", err=True)
+      click.echo(e, err=True)
+      sys.exit(1)
+    except ApiError as e:
+      click.secho(str(e), fg='red', err=True)
+      sys.exit(1)
+
+  if completed < len(names):
+    click.secho(f'{len(names) - completed} of {len(names)} scans did not '
+                f'complete in time.', fg='red', err=True)
+    sys.exit(1)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 21/10/2026 2:05 pm
+# @Organisation: Veracode
+
+import os.path
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from constant import profile_filename
+
+
+class ScanJob:
+  """One Java wrapper UploadAndScan invocation and its outcome."""
+
+  def __init__(self, application_name, artifact_path, version):
+    self.application_name = application_name
+    self.artifact_path = artifact_path
+    self.version = version
+    self.status = 'pending'  # then ok, failed, timeout or error
+    self.returncode = None
+    self.duration = 0.0
+    self.log_path = None
+    self.message = ''
+
+  def command(self, java_wrapper, create_profile, java='java'):
+    return [java, '-jar', java_wrapper, '-action', 'UploadAndScan',
+            '-appname', self.application_name,
+            '-createprofile', 'true' if create_profile else 'false',
+            '-filepath', self.artifact_path, '-version', self.version]
+
+
+def run_scan_jobs(jobs, java_wrapper, log_dir, create_profile=False,
+                  max_workers=4, timeout=None, java='java'):
+  """Run ``jobs`` in a pool of at most ``max_workers`` wrapper processes.
+
+  Each job's stdout/stderr goes to its own file in ``log_dir``; a job still
+  running after ``timeout`` seconds is killed. Yields jobs as they finish,
+  with status, return code, duration and log path filled in.
+  """
+  log_dir.mkdir(parents=True, exist_ok=True)
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    futures = []
+    for idx, job in enumerate(jobs, start=1):
+      job.log_path = log_dir / profile_filename(
+        f'{idx:03d}-{job.application_name}-{job.version}.log')
+      futures.append(executor.submit(_run_scan_job, job, java_wrapper,
+                                     create_profile, timeout, java))
+    for future in as_completed(futures):
+      yield future.result()
+
+
+def _run_scan_job(job, java_wrapper, create_profile, timeout, java):
+  if not os.path.exists(job.artifact_path):
+    job.status = 'error'
+    job.message = f'Cannot locate file {job.artifact_path}.'
+    job.log_path = None
+    return job
+
+  command = job.command(java_wrapper, create_profile, java)
+  start = time.monotonic()
+  with open(job.log_path, 'w') as log:
+    log.write(' '.join(command) + '\n\n')
+    log.flush()
+    try:
+      job.returncode = subprocess.run(command, stdin=subprocess.DEVNULL,
+                                      stdout=log, stderr=subprocess.STDOUT,
+                                      timeout=timeout).returncode
+      job.status = 'ok' if job.returncode == 0 else 'failed'
+    except subprocess.TimeoutExpired:
+      job.status = 'timeout'
+      job.message = f'Killed after {timeout}s.'
+    except OSError as e:
+      job.status = 'error'
+      job.message = str(e)
+  job.duration = time.monotonic() - start
+  return job
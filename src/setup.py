@@ -10,7 +10,26 @@ setup(
               'constant',
               'credentials_commands',
               'application_commands',
-              'user_commands'
+              'user_commands',
+              'api_client',
+              'bulk',
+              'cache',
+              'inventory',
+              'journal',
+              'throttle',
+              'provision_commands',
+              'fanout',
+              'async_client',
+              'stats',
+              'output',
+              'scan_commands',
+              'scan_pool',
+              'filters',
+              'mirror',
+              'sync_commands',
+              'picker',
+              'payload',
+              'planner'
               ],
   install_requires=[
     'Click',
@@ -18,6 +37,9 @@ setup(
     'veracode-api-signing',
     'openpyxl',
   ],
+  extras_require={
+    'async': ['aiohttp'],
+  },
   entry_points={
     'console_scripts': [
       'pov=pov:main'
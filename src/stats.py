@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 21/10/2026 9:20 am
+# @Organisation: Veracode
+
+import bisect
+import json
+import re
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import click
+
+# upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+                      float('inf'))
+# GUIDs, user ids and numeric ids collapse into one endpoint
+_ID_SEGMENT = re.compile(r'^(?:[0-9a-fA-F-]{16,}|\d+)$')
+DISPLAY_STATS_FMT = "{:40} {:>8} {:>6} {:>7} {:>9} {:>9} {:>10}"
+
+
+def endpoint_of(method, url):
+  """``"GET /appsec/v1/applications/{id}"`` style key for a request."""
+  path = '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment
+                  for segment in urlsplit(url).path.split('/'))
+  return f'{method.upper()} {path}'
+
+
+class EndpointStats:
+  def __init__(self):
+    self.requests = 0
+    self.errors = 0
+    self.retries = 0
+    self.bytes_sent = 0
+    self.bytes_received = 0
+    self.latency_total = 0.0
+    self.latency_max = 0.0
+    self.histogram = [0] * len(LATENCY_BUCKETS_MS)
+
+  def percentile_ms(self, fraction):
+    """Upper bound of the histogram bucket holding ``fraction``."""
+    if not self.requests:
+      return 0.0
+    rank, seen = fraction * self.requests, 0
+    for bound, count in zip(LATENCY_BUCKETS_MS, self.histogram):
+      seen += count
+      if seen >= rank:
+        return min(bound, self.latency_max * 1000)
+    return self.latency_max * 1000
+
+  def to_dict(self):
+    return {
+      'requests': self.requests,
+      'errors': self.errors,
+      'retries': self.retries,
+      'bytes_sent': self.bytes_sent,
+      'bytes_received': self.bytes_received,
+      'latency_mean_ms': self.latency_total * 1000 / self.requests
+      if self.requests else 0.0,
+      'latency_p50_ms': self.percentile_ms(0.50),
+      'latency_p95_ms': self.percentile_ms(0.95),
+      'latency_max_ms': self.latency_max * 1000,
+      'latency_histogram_ms': {
+        ('inf' if bound == float('inf') else str(bound)): count
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.histogram)},
+    }
+
+
+class RequestStats:
+  """Thread-safe per-endpoint counters for every HTTP attempt of a run.
+
+  Shared by all clients of a command (including --all-profiles fan-out),
+  recorded by ``VeracodeApiClient`` and read by the live status line and
+  the ``--stats`` summary.
+  """
+
+  def __init__(self):
+    self.started = time.monotonic()
+    self.requests = 0
+    self.endpoints = {}
+    self.lock = threading.Lock()
+
+  def record(self, method, url, elapsed, status=None, bytes_sent=0,
+             bytes_received=0):
+    """Record one attempt; ``status`` None means it raised."""
+    with self.lock:
+      stats = self._endpoint(method, url)
+      self.requests += 1
+      stats.requests += 1
+      stats.errors += status is None or status >= 400
+      stats.bytes_sent += bytes_sent
+      stats.bytes_received += bytes_received
+      stats.latency_total += elapsed
+      stats.latency_max = max(stats.latency_max, elapsed)
+      stats.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS,
+                                         elapsed * 1000)] += 1
+
+  def record_retry(self, method, url):
+    with self.lock:
+      self._endpoint(method, url).retries += 1
+
+  def rate(self, since=None, requests_before=0):
+    """Requests per second since ``since`` (default: the start of the run)."""
+    since = self.started if since is None else since
+    elapsed = time.monotonic() - since
+    return (self.requests - requests_before) / elapsed if elapsed else 0.0
+
+  def summary(self):
+    with self.lock:
+      endpoints = {name: stats.to_dict()
+                   for name, stats in sorted(self.endpoints.items())}
+    totals = {key: sum(stats[key] for stats in endpoints.values())
+              for key in ('requests', 'errors', 'retries', 'bytes_sent',
+                          'bytes_received')}
+    elapsed = time.monotonic() - self.started
+    totals['seconds'] = elapsed
+    totals['requests_per_second'] = totals['requests'] / elapsed \
+      if elapsed else 0.0
+    return {'totals': totals, 'endpoints': endpoints}
+
+  def write_json(self, path):
+    with click.open_file(path, 'w') as fp:
+      json.dump(self.summary(), fp, indent=4)
+
+  def echo_summary(self):
+    """Print the summary to stderr, keeping stdout clean for piping."""
+    summary = self.summary()
+    click.echo(DISPLAY_STATS_FMT.format('Endpoint', 'Requests', 'Errors',
+                                        'Retries', 'p50 ms', 'p95 ms',
+                                        'KB in'), err=True)
+    click.echo(DISPLAY_STATS_FMT.format('-' * 40, '-' * 8, '-' * 6, '-' * 7,
+                                        '-' * 9, '-' * 9, '-' * 10), err=True)
+    for name, stats in summary['endpoints'].items():
+      click.echo(DISPLAY_STATS_FMT.format(
+        name[:40], stats['requests'], stats['errors'], stats['retries'],
+        f"{stats['latency_p50_ms']:.0f}", f"{stats['latency_p95_ms']:.0f}",
+        f"{stats['bytes_received'] / 1024:.1f}"), err=True)
+    totals = summary['totals']
+    click.echo(f"{totals['requests']} requests in {totals['seconds']:.1f}s "
+               f"({totals['requests_per_second']:.1f} req/s), "
+               f"{totals['errors']} errors, {totals['retries']} retries",
+               err=True)
+
+  def _endpoint(self, method, url):
+    key = endpoint_of(method, url)
+    stats = self.endpoints.get(key)
+    if stats is None:
+      stats = self.endpoints[key] = EndpointStats()
+    return stats
+
+
+class LiveStatus(threading.Thread):
+  """Live "label: N requests, X req/s" line on stderr while work runs.
+
+  Only drawn when stderr is a terminal, and erased when stopped, so piped
+  output never contains status noise.
+  """
+
+  def __init__(self, stats, label, interval=0.5):
+    super().__init__(daemon=True)
+    self.stats = stats
+    self.label = label
+    self.interval = interval
+    self.done = threading.Event()
+    self.enabled = sys.stderr.isatty()
+    self.since = time.monotonic()
+    self.requests_before = stats.requests
+
+  def run(self):
+    while not self.done.wait(self.interval):
+      requests = self.stats.requests - self.requests_before
+      rate = self.stats.rate(self.since, self.requests_before)
+      sys.stderr.write(
+        f'\r{self.label}: {requests} requests, {rate:.1f} req/s\033[K')
+      sys.stderr.flush()
+
+  def __enter__(self):
+    if self.enabled:
+      self.start()
+    return self
+
+  def __exit__(self, *exc_info):
+    if self.enabled:
+      self.done.set()
+      self.join()
+      sys.stderr.write('\r\033[K')
+      sys.stderr.flush()
+
+
+def status_until_first(iterable, stats, label):
+  """Show a live status line until the first item of ``iterable`` arrives."""
+  iterator = iter(iterable)
+  with LiveStatus(stats, label):
+    first = next(iterator, None)
+  if first is None:
+    return
+  yield first
+  yield from iterator
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 21/10/2026 6:15 pm
+# @Organisation: Veracode
+
+import sys
+import time
+
+import click
+import requests
+from api_client import activated_client, ApiError
+from fanout import resolve_profiles, fan_out
+from mirror import Mirror, ENTITIES
+
+DISPLAY_SYNC_FMT = "{:16.16} {:12} {:10} {:>8} {:>8}"
+
+
+@click.command()
+@click.pass_context
+@click.option('--full', is_flag=True,
+              help='Crawl everything again instead of fetching changes')
+@click.option('--only', 'entities', multiple=True,
+              type=click.Choice(ENTITIES),
+              help='Only mirror this kind of record (repeatable)')
+@click.option('--all-profiles', is_flag=True,
+              help='Mirror every credentials profile')
+@click.option('--profiles',
+              help='Comma-separated credentials profiles to mirror')
+def sync(ctx, full, entities, all_profiles, profiles):
+  """Mirror Applications, Users and Policies locally
+
+  The first run crawls everything into ~/.veracode/mirror; later runs only
+  fetch what changed. "applications list" and "users list" read the mirror
+  with --offline.
+  """
+  config = ctx.obj['config']
+  if not config.sections():
+    click.secho(
+      'You have not configured Veracode API credentials, '
+      'please run \"pov credentials add\" command before running this command.')
+    sys.exit(1)
+  entities = entities or ENTITIES
+
+  def sync_profile(client):
+    with Mirror(client.profile) as mirror:
+      yield from mirror.sync(client, entities, full)
+
+  started = time.monotonic()
+  profiles = resolve_profiles(config, all_profiles, profiles)
+  if profiles is None:
+    client = activated_client(ctx)
+    rows = ((client.profile, result, None)
+            for result in sync_profile(client))
+  else:
+    rows = fan_out(config, ctx.obj['setting'], profiles, sync_profile,
+                   ctx.obj.get('engine'), ctx.obj.get('stats'))
+
+  click.echo(DISPLAY_SYNC_FMT.format('Profile', 'Records', 'Sync', 'Fetched',
+                                     'Total'))
+  click.echo(DISPLAY_SYNC_FMT.format('-' * 16, '-' * 12, '-' * 10, '-' * 8,
+                                     '-' * 8))
+  failed = []
+  try:
+    for profile, result, error in rows:
+      if error is not None:
+        click.secho(f'{profile}: {error}', fg='red', err=True)
+        failed.append(profile)
+        continue
+      click.echo(DISPLAY_SYNC_FMT.format(profile, result.entity, result.mode,
+                                         result.fetched, result.total))
+  except requests.RequestException as e:
+    click.echo("Whoops!")
+    click.echo(e)
+    sys.exit(1)
+  except ApiError as e:
+    click.secho(str(e), fg='red')
+    sys.exit(1)
+
+  click.echo(f'Synced in {time.monotonic() - started:.1f}s.')
+  if failed:
+    sys.exit(1)
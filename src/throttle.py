@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 18/10/2026 4:05 pm
+# @Organisation: Veracode
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class AdaptiveRateLimiter:
+  """Token bucket shared by every thread of a client.
+
+  The refill rate is additive-increase/multiplicative-decrease: a 429
+  halves it (down to ``min_rate``, at most once per ``cooldown`` seconds so
+  one burst of rejections counts once) and each success nudges it back up
+  towards ``max_rate``. A Retry-After passed to ``on_throttled`` pauses
+  every caller, not just the one that was rejected.
+  """
+
+  def __init__(self, max_rate, min_rate=1.0, increase=0.5, cooldown=1.0):
+    self.max_rate = float(max_rate)
+    self.min_rate = min(float(min_rate), self.max_rate)
+    self.increase = increase
+    self.cooldown = cooldown
+    self.decreased = 0.0
+    self.rate = self.max_rate
+    self.tokens = self.max_rate
+    self.updated = time.monotonic()
+    self.paused_until = 0.0
+    self.lock = threading.Lock()
+
+  def acquire(self):
+    """Block until a request may be sent; return the seconds waited."""
+    waited = 0.0
+    delay = self.reserve()
+    while delay:
+      time.sleep(delay)
+      waited += delay
+      delay = self.reserve()
+    return waited
+
+  def reserve(self):
+    """Take a token if one is free (returning 0), else the seconds to wait.
+
+    The non-blocking half of ``acquire``, for callers that wait with
+    ``asyncio.sleep`` instead of blocking a thread.
+    """
+    with self.lock:
+      now = time.monotonic()
+      self.tokens = min(self.rate, self.tokens +
+                        (now - self.updated) * self.rate)
+      self.updated = now
+      if now < self.paused_until:
+        return self.paused_until - now
+      if self.tokens >= 1:
+        self.tokens -= 1
+        return 0.0
+      return (1 - self.tokens) / self.rate
+
+  def on_success(self):
+    with self.lock:
+      self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+  def on_throttled(self, retry_after=None):
+    with self.lock:
+      now = time.monotonic()
+      if now - self.decreased >= self.cooldown:
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.decreased = now
+      self.tokens = min(self.tokens, 0)
+      if retry_after:
+        self.paused_until = max(self.paused_until, now + retry_after)
+
+
+class RetryPolicy:
+  """Exponential backoff with full jitter for transient API failures.
+
+  429s are retried for every method. 5xx responses and connection errors
+  are only retried for idempotent methods, so a POST that may have reached
+  the server is never sent twice.
+  """
+
+  def __init__(self, max_retries, backoff_base=0.5, backoff_max=30.0):
+    self.max_retries = max_retries
+    self.backoff_base = backoff_base
+    self.backoff_max = backoff_max
+
+  def should_retry(self, method, attempt, response=None):
+    if attempt >= self.max_retries:
+      return False
+    if response is not None and response.status_code == 429:
+      return True
+    if method.upper() not in IDEMPOTENT_METHODS:
+      return False
+    return response is None or response.status_code in RETRYABLE_STATUS
+
+  def backoff(self, attempt):
+    return random.uniform(
+      0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+def retry_after(response):
+  """Seconds requested by a Retry-After header, if any."""
+  value = response.headers.get('Retry-After')
+  if not value:
+    return None
+  try:
+    return max(0.0, float(value))
+  except ValueError:
+    pass
+  try:
+    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+  except (TypeError, ValueError):
+    return None
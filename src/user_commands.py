@@ -4,175 +4,213 @@
 # @Time: 20/10/2022 11:02 am
 # @Organisation: Veracode
 
-from constant import USER_CREATION_INPUT, SpinnerThread
-import copy
+from constant import USER_CREATION_INPUT, DISPLAY_PROFILE_FMT
 import json
+from fnmatch import fnmatch
 import click
 import requests
-from veracode_api_signing.plugin_requests import RequestsAuthPluginVeracodeHMAC
 import sys
-from credentials_commands import activate_credentials
+from api_client import activated_client, ApiError, JSON_HEADERS, \
+  describe_error
+from bulk import run_bulk, print_bulk_summary
+from fanout import resolve_profiles, fan_out, echo_profile_rows
+from stats import LiveStatus, status_until_first
+from output import output_option
+from filters import ListingFilter
+from mirror import iter_mirror_rows
+from picker import Picker
+from payload import PayloadTemplate
+from planner import CallPlan, print_call_plan
 
 DISPLAY_USERS_FMT = "{:<3} {:35} {:20} {:20}"
 DISPLAY_USERS_DETAIL_FMT = "{:<3} {:<30} {:<12} {:12} {:12}"
 
 
-def print_users_headers(adding_user=None, show_details=False):
+def users_headers(adding_user=None, show_details=False, show_profile=False):
+  profile, profile_rule = (DISPLAY_PROFILE_FMT.format("Profile"),
+                           DISPLAY_PROFILE_FMT.format("-" * 16)) \
+    if show_profile else ('', '')
   if not show_details:
-    click.echo(DISPLAY_USERS_FMT.
-               format("ID",
-                      "Email",
-                      "Enabled" if not adding_user else "First Name",
-                      "SAML" if not adding_user else "Last Name"))
-    click.echo(DISPLAY_USERS_FMT.format("-" * 3, "-" * 30, "-" * 12, "-" * 12))
-  else:
-    click.echo(
-      DISPLAY_USERS_DETAIL_FMT.format("ID", "Email", "First Name", "Last Name",
-                                      "Last Login"))
-    click.echo(
-      DISPLAY_USERS_DETAIL_FMT.format("-" * 3, "-" * 30, "-" * 12, "-" * 12,
-                                      "-" * 12))
-
-
-def fetch_users(settings_dict, config, show_details=False):
-  user_list = []
-  spinner_thread = SpinnerThread()
-  spinner_thread.start()
-  api_id = config[settings_dict['activated_credentials']]['veracode_api_key_id']
-  api_key = config[settings_dict['activated_credentials']][
-    'veracode_api_key_secret']
+    return (profile + DISPLAY_USERS_FMT.
+            format("ID",
+                   "Email",
+                   "Enabled" if not adding_user else "First Name",
+                   "SAML" if not adding_user else "Last Name"),
+            profile_rule +
+            DISPLAY_USERS_FMT.format("-" * 3, "-" * 30, "-" * 12, "-" * 12))
+  return (profile +
+          DISPLAY_USERS_DETAIL_FMT.format("ID", "Email", "First Name",
+                                          "Last Name", "Last Login"),
+          profile_rule +
+          DISPLAY_USERS_DETAIL_FMT.format("-" * 3, "-" * 30, "-" * 12,
+                                          "-" * 12, "-" * 12))
+
+
+def print_users_headers(adding_user=None, show_details=False,
+                        show_profile=False):
+  for line in users_headers(adding_user, show_details, show_profile):
+    click.echo(line)
+
+
+def user_filter(email=None, saml=None, enabled=None):
+  """ListingFilter for the identity API's user search.
+
+  search_term also matches names, so the email match is rechecked
+  client-side; saml_user and login_enabled are exact.
+  """
+  listing_filter = ListingFilter()
+  if email:
+    listing_filter.push(search_term=email)
+    listing_filter.require(
+      lambda user: email.lower() in user['email_address'].lower())
+  for param, value in (('saml_user', saml), ('login_enabled', enabled)):
+    if value is not None:
+      listing_filter.push(**{param: 'true' if value else 'false'})
+  return listing_filter
+
+
+def iter_platform_users(client, show_details=False, detail_mode='parallel',
+                        concurrency=None, page_size=None, refresh=False,
+                        listing_filter=None, revalidate=False):
+  """Yield every platform user (or those matching ``listing_filter``), one
+  page at a time.
+
+  With ``show_details``, ``detail_mode`` picks how first/last name and last
+  login are filled in: ``inline`` asks the identity API for detailed records
+  in the list call itself, ``parallel`` hydrates each user with a concurrent
+  ``GET /users/{id}`` and yields users as their details arrive; filtered
+  out users are never hydrated.
+  RequestException and ApiError propagate to the caller.
+  """
+  inline = show_details and detail_mode == 'inline'
+  user_iter = _iter_users(client, inline, page_size, refresh,
+                          listing_filter or ListingFilter(), revalidate)
+  if not show_details or inline:
+    return user_iter
+  return hydrate_user_details(client, user_iter, concurrency)
+
+
+def fetch_users(client, show_details=False, detail_mode='parallel',
+                concurrency=None, page_size=None, refresh=False,
+                listing_filter=None, revalidate=False):
+  """Like iter_platform_users, behind a status line and error handling."""
   try:
-    response = requests. \
-      get(settings_dict['admin_base'] + "/users?size=160",
-          auth=RequestsAuthPluginVeracodeHMAC(api_key_id=api_id,
-                                              api_key_secret=api_key),
-          headers=settings_dict['headers'])
+    yield from status_until_first(
+      iter_platform_users(client, show_details, detail_mode, concurrency,
+                          page_size, refresh, listing_filter, revalidate),
+      client.stats, 'Fetching users')
   except requests.RequestException as e:
     click.echo("Whoops!")
     click.echo(e)
     sys.exit(1)
+  except ApiError as e:
+    click.secho(str(e), fg='red')
+
+
+def _iter_users(client, inline, page_size, refresh, listing_filter,
+                revalidate=False):
+  # only the search endpoint takes filter parameters
+  path = "/users/search" if listing_filter.params else "/users"
+  params = dict(listing_filter.params, detailed='true' if inline else None)
+  for user in listing_filter.apply(client.iter_listing(
+          client.admin_url(path), 'users', params=params,
+          page_size=page_size, refresh=refresh, revalidate=revalidate)):
+    yield User.from_detailed(user) if inline else User.from_api(user)
+
+
+def hydrate_user_details(client, user_list, concurrency=None):
+  """Yield users in completion order as their detail record arrives."""
+  def build_request(user):
+    return 'GET', client.admin_url('/users/' + user.user_id), {}
+
+  for user, response, error in client.map_requests(user_list, build_request,
+                                                   concurrency):
+    if error is not None:
+      raise error
+    if response.ok:
+      user.update_details(response.json())
+    yield user
 
-  if response.ok:
-    data = response.json()
-    for user in data['_embedded']['users']:
-      local_user = User(
-        '', '', user['email_address'], user['email_address'],
-        user['user_id'], user['saml_user'], user['login_enabled'])
-      user_list.append(local_user)
-  else:
-    click.secho(f"{response.status_code} "
-                f"{response.json()['message']}",
-                fg='red')
 
+def format_user(idx, user, show_details=False):
   if not show_details:
-    spinner_thread.set_complete()
-    sys.stdout.write('\b')
-    return user_list
+    return DISPLAY_USERS_FMT.format(idx, user.email,
+                                    "True" if user.enabled else "False",
+                                    "True" if user.saml else "False")
+  return DISPLAY_USERS_DETAIL_FMT.format(
+    idx,
+    user.email[:28] + (user.email[28:] and '..'),
+    user.first_name[:10] + (user.first_name[10:] and '..'),
+    user.last_name[:10] + (user.last_name[10:] and '..'),
+    "None" if not user.last_login else user.last_login)
 
+
+def print_users(user_list, show_details=False):
+  for idx, user in enumerate(user_list, start=1):
+    click.echo(format_user(idx, user, show_details))
+
+
+def diff_users(user_list, client, refresh=False, platform_users=None):
+  """Split ``user_list`` into (to create, already present) by email,
+  against ``platform_users`` if already fetched, else a revalidated
+  listing."""
+  if platform_users is None:
+    platform_users = fetch_users(client, refresh=refresh, revalidate=True)
+  existing = {user.email.lower() for user in platform_users}
+  inserts, present = [], []
   for user in user_list:
-    try:
-      response = requests.get(
-        settings_dict['admin_base'] + '/users/' + user.user_id,
-        auth=RequestsAuthPluginVeracodeHMAC(
-          api_key_id=api_id,
-          api_key_secret=api_key),
-        headers=settings_dict['headers'])
+    email = user.email.lower()
+    if email in existing:
+      present.append(user)
+    else:
+      existing.add(email)
+      inserts.append(user)
+  return inserts, present
 
-    except requests.RequestException as e:
-      click.echo('Whoops!')
-      click.echo(e)
-      sys.exit(1)
-    if response.ok:
-      data = response.json()
-      user.first_name = data['first_name']
-      user.last_name = data['last_name']
-      user.last_login = None if 'last_login' not in data.keys() else data[
-        'last_login']
 
-  spinner_thread.set_complete()
-  sys.stdout.write('\b')
-  return user_list
+def create_user_request(client, user):
+  return 'POST', client.admin_url("/users"), \
+         {'headers': JSON_HEADERS, 'data': user.get_user_json()}
 
 
-def print_users(user_list, show_details=False):
-  if not show_details:
-    for idx, user in enumerate(user_list, start=1):
-      click.echo(DISPLAY_USERS_FMT.
-                 format(idx, user.email,
-                        "True" if user.enabled else "False",
-                        "True" if user.saml else "False"))
-  else:
-    for idx, user in enumerate(user_list, start=1):
-      click.echo(
-        DISPLAY_USERS_DETAIL_FMT.
-        format(idx,
-               user.email[:28] + (user.email[28:] and '..'),
-               user.first_name[:10] + (user.first_name[10:] and '..'),
-               user.last_name[:10] + (user.last_name[10:] and '..'),
-               "None" if not user.last_login else user.last_login))
-
-
-def add_users_to_platform(user_list, config, settings_dict):
-  api_id = config[settings_dict['activated_credentials']]['veracode_api_key_id']
-  api_key = config[settings_dict['activated_credentials']][
-    'veracode_api_key_secret']
-
-  count = 0
-
-  with click.progressbar(
-          length=len(user_list),
-          show_eta=False,
-          item_show_func=lambda first_name: f"Adding user: {first_name}"
-  ) as bar:
-    for idx, user in enumerate(user_list, start=1):
-      user_json = user.get_user_json()
-      try:
-        response = requests. \
-          post(settings_dict['admin_base'] + "/users",
-               auth=RequestsAuthPluginVeracodeHMAC(api_key_id=api_id,
-                                                   api_key_secret=api_key),
-               headers={'Content-Type': 'application/json',
-                        'Accept': 'application/json'},
-
-               data=user_json)
-      except requests.RequestException as e:
-        click.echo("Whoops!")
-        click.echo(e)
-        # sys.exit(1)
-
-      if response.ok:
-        count += 1
-      else:
-        click.secho(f"{response.status_code} "
-                    f"{response.json()['message']}",
-                    fg='red')
-        # sys.exit(1)
-      bar.update(idx - 1, user.first_name)
+def add_users_to_platform(user_list, client, concurrency=None,
+                          preflight=True):
+  """Create ``user_list``; with ``preflight``, emails already on the
+  platform are skipped first."""
+  def label(user):
+    return user.email
+
+  if preflight:
+    user_list, present = diff_users(user_list, client)
+    if present:
+      click.secho(f'Skipping {len(present)} users already present: '
+                  f'{", ".join(label(item) for item in present)}',
+                  fg='yellow')
 
-  click.secho(f'Successfully created {count} platform users.', fg='green')
+  def build_request(user):
+    return create_user_request(client, user)
+
+  result = run_bulk(client, user_list, build_request,
+                    label=label,
+                    progress_label='Adding user',
+                    concurrency=concurrency)
+  print_bulk_summary(result, label, 'users', 'created')
+  client.update_cache('users', 'user_id',
+                      upserts=[response.json()
+                               for _, response in result.succeeded])
+  return result
 
 
 @click.group()
 @click.pass_context
 def users(ctx):
   """Manage Veracode Users"""
-  setting_dict = ctx.obj['setting']
   config = ctx.obj['config']
   if not config.sections():
     click.secho(
       'You have not configured Veracode API credentials, '
       'please run \"pov credentials add\" command before running this command.')
     sys.exit(1)
-  use_activated_profile = click.confirm(
-    f"Your activated credentials is "
-    f"\"{setting_dict['activated_credentials']}\""
-    f", continue using this profile to run this command?")
-  while not use_activated_profile:
-    ctx.invoke(activate_credentials)
-    use_activated_profile = click.confirm(
-      f"Your activated credentials is "
-      f"\"{setting_dict['activated_credentials']}\""
-      f", continue using this profile to run this command?")
 
 
 @users.command('list')
@@ -181,43 +219,83 @@ def users(ctx):
               '--show-details',
               help='Include Veracode User Details',
               is_flag=True)
-def list_users(ctx, show_details):
-  """List Veracode Users"""
-  if show_details:
-    click.secho('Showing user details will take longer time to run.',
-                fg='yellow')
-  setting_dict = ctx.obj['setting']
-  config = ctx.obj['config']
-  print_users_headers(show_details=show_details)
-  user_list = fetch_users(setting_dict, config, show_details=show_details)
-  print_users(user_list, show_details=show_details)
-
-
-def delete_one_user(user, settings_dict, config):
-  spinner_thread = SpinnerThread()
+@click.option('--detail-mode',
+              type=click.Choice(['parallel', 'inline']),
+              default='parallel',
+              show_default=True,
+              help='Fetch details with concurrent per-user requests, or '
+                   'inline in the list call where the API supports it')
+@click.option('-c', '--concurrency', type=click.IntRange(min=1),
+              help='Number of user details to fetch in parallel')
+@click.option('--page-size', type=click.IntRange(min=1),
+              help='Number of users requested per page')
+@click.option('--refresh', is_flag=True,
+              help='Ignore the local listing cache')
+@click.option('--all-profiles', is_flag=True,
+              help='List the users of every credentials profile')
+@click.option('--profiles',
+              help='Comma-separated credentials profiles to list')
+@click.option('-e', '--email', help='Only users whose email contains this text')
+@click.option('--saml/--no-saml', default=None,
+              help='Only SAML users, or only non-SAML users')
+@click.option('--enabled/--disabled', default=None,
+              help='Only users whose login is enabled, or disabled')
+@click.option('--offline', is_flag=True,
+              help='Read the local mirror written by "pov sync" instead of '
+                   'calling the API')
+@output_option
+def list_users(ctx, show_details, detail_mode, concurrency, page_size,
+               refresh, all_profiles, profiles, email, saml, enabled, offline,
+               output):
+  """List Veracode Users
+
+  With --all-profiles or --profiles, every profile is queried in parallel
+  and rows are printed as they arrive, tagged with their profile. Filters
+  are sent to the identity API's user search, so only matching users are
+  downloaded.
+  """
+  listing_filter = user_filter(email, saml, enabled)
+  profiles = resolve_profiles(ctx.obj['config'], all_profiles, profiles)
+  if offline:
+    # the mirror keeps detailed records, so no hydration is needed
+    rows = iter_mirror_rows(
+      profiles or [ctx.obj['setting']['activated_credentials']],
+      lambda mirror: map(User.from_detailed,
+                         mirror.users(email, saml, enabled)))
+  elif profiles is None:
+    client = activated_client(ctx)
+    rows = ((client.profile, user, None) for user in
+            fetch_users(client, show_details=show_details,
+                        detail_mode=detail_mode, concurrency=concurrency,
+                        page_size=page_size, refresh=refresh,
+                        listing_filter=listing_filter))
+  else:
+    rows = fan_out(ctx.obj['config'], ctx.obj['setting'], profiles,
+                   lambda client: iter_platform_users(
+                     client, show_details, detail_mode, concurrency,
+                     page_size, refresh, listing_filter),
+                   ctx.obj.get('engine'), ctx.obj.get('stats'))
+  if output == 'table':
+    print_users_headers(show_details=show_details,
+                        show_profile=profiles is not None)
+  if echo_profile_rows(rows,
+                       lambda idx, user: format_user(idx, user, show_details),
+                       User.FIELDS, output, show_profile=profiles is not None):
+    sys.exit(1)
 
-  api_id = config[settings_dict['activated_credentials']]['veracode_api_key_id']
-  api_key = config[settings_dict['activated_credentials']][
-    'veracode_api_key_secret']
 
+def delete_one_user(user, client):
   if click.confirm(f'Delete \"{user.first_name}\", continue?'):
-    spinner_thread.start()
     try:
-      response = requests. \
-        delete(settings_dict[
-                 'admin_base'] + "/users/" + user.user_id,
-               auth=RequestsAuthPluginVeracodeHMAC(api_key_id=api_id,
-                                                   api_key_secret=api_key),
-               headers=settings_dict['headers'])
+      with LiveStatus(client.stats, 'Deleting user'):
+        response = client.delete(client.admin_url("/users/" + user.user_id))
     except requests.RequestException as e:
       click.echo("Whoops!")
       click.echo(e)
       sys.exit(1)
 
-    spinner_thread.set_complete()
-    sys.stdout.write('\b')
-
     if response.ok:
+      client.update_cache('users', 'user_id', removals=[user.user_id])
       return 'success'
     else:
       click.secho(f"{response.status_code} "
@@ -226,12 +304,148 @@ def delete_one_user(user, settings_dict, config):
       return 'fail'
 
 
+def fetch_self_user_id(client):
+  """user_id of the account behind the API credentials.
+
+  Bulk selections rely on it to leave the API account alone, so a failure
+  to read it stops the command instead of selecting everyone.
+  """
+  try:
+    response = client.get(client.admin_url('/users/self'))
+  except requests.RequestException as e:
+    click.echo("Whoops!")
+    click.echo(e)
+    sys.exit(1)
+  if not response.ok:
+    reason = describe_error(response)
+  elif not response.json().get('user_id'):
+    reason = 'no user_id in the response'
+  else:
+    return response.json()['user_id']
+  click.secho(f'Cannot identify the API account ({reason}); stopping so it '
+              f'is not selected.', fg='red')
+  sys.exit(1)
+
+
+def fetch_team_ids(client, names):
+  """``{name: team_id}`` for team names (case-insensitive)."""
+  teams = {team['team_name'].lower(): team['team_id'] for team in
+           client.iter_listing(client.admin_url('/teams'), 'teams',
+                               params={'all_for_org': 'true'})}
+  unknown = [name for name in names if name.lower() not in teams]
+  if unknown:
+    raise click.BadParameter(f'unknown team {", ".join(unknown)}',
+                             param_hint="'--team'")
+  return {name: teams[name.lower()] for name in names}
+
+
+def _adjust(current, replace, add, remove):
+  return ((set(replace) if replace else set(current)) | set(add)) - \
+         set(remove)
+
+
+class UserUpdate:
+  """Role, team and login changes to apply to many users.
+
+  ``roles``/``team_ids`` replace a user's whole set when given; the
+  ``add_*``/``remove_*`` variants adjust the set the user already has.
+  """
+
+  def __init__(self, roles=(), add_roles=(), remove_roles=(), team_ids=(),
+               add_team_ids=(), remove_team_ids=(), active=None):
+    self.roles = (roles, add_roles, remove_roles)
+    self.team_ids = (team_ids, add_team_ids, remove_team_ids)
+    self.active = active
+
+  def __bool__(self):
+    return any(self.roles) or any(self.team_ids) or self.active is not None
+
+  def body_for(self, detail):
+    """Partial PUT body for a detailed user record, with only the fields
+    that differ, or None if the user already matches."""
+    body = {}
+    roles = {role['role_name'] for role in detail.get('roles') or []}
+    wanted = _adjust(roles, *self.roles)
+    if wanted != roles:
+      body['roles'] = [{'role_name': role} for role in sorted(wanted)]
+    teams = {team['team_id'] for team in detail.get('teams') or []}
+    wanted = _adjust(teams, *self.team_ids)
+    if wanted != teams:
+      body['teams'] = [{'team_id': team_id} for team_id in sorted(wanted)]
+    active = detail.get('active', detail.get('login_enabled'))
+    if self.active is not None and self.active != active:
+      body['active'] = self.active
+    return body or None
+
+
+def update_user_request(client, user, body):
+  return 'PUT', client.admin_url("/users/" + user.user_id), \
+         {'params': {'partial': 'true'}, 'headers': JSON_HEADERS,
+          'data': json.dumps(body)}
+
+
+def delete_user_request(client, user):
+  return 'DELETE', client.admin_url("/users/" + user.user_id), {}
+
+
+def select_users(user_list, emails=(), user_ids=(), select_all=False,
+                 exclude_user_id=None):
+  """Users matching any email glob (case-insensitive) or user id.
+
+  ``exclude_user_id`` (the API account itself) is never selected.
+  """
+  patterns = [email.lower() for email in emails]
+  user_ids = set(user_ids)
+  return [user for user in user_list
+          if user.user_id != exclude_user_id
+          and (select_all or user.user_id in user_ids
+               or any(fnmatch(user.email.lower(), pattern)
+                      for pattern in patterns))]
+
+
+def delete_users(user_list, client, concurrency=None):
+  """Delete ``user_list`` through the worker pool, then summarise."""
+  def label(user):
+    return user.email
+
+  result = run_bulk(client, user_list,
+                    lambda user: delete_user_request(client, user),
+                    label=label,
+                    progress_label='Deleting user',
+                    concurrency=concurrency)
+  print_bulk_summary(result, label, 'users', 'deleted')
+  client.update_cache('users', 'user_id',
+                      removals=[user.user_id for user, _ in result.succeeded])
+  return result
+
+
+def delete_users_by_id(user_list, client):
+  """Prompt for one user number at a time, for piped input."""
+  while True:
+    print_users_headers()
+    print_users(user_list)
+    user_id = click.prompt(
+      "Enter user id (i.e. 3) to delete or \"-1\" to quit", type=int)
+    if user_id == -1:
+      sys.exit(0)
+    if user_id < 1 or user_id > len(user_list):
+      click.secho(f'{user_id} is not in range.', fg='red')
+    else:
+      user = user_list[user_id - 1]
+      result = delete_one_user(user, client)
+      if result == 'fail':
+        sys.exit(1)
+      else:
+        del user_list[user_id - 1]
+
+
 @users.command('add')
 @click.pass_context
-def add_user(ctx):
+@click.option('-c', '--concurrency', type=click.IntRange(min=1),
+              help='Number of users to create in parallel')
+def add_user(ctx, concurrency):
   """Add Veracode Users"""
-  setting_dict = ctx.obj['setting']
-  config = ctx.obj['config']
+  client = activated_client(ctx)
   user_list = []
   while True:
     email = click.prompt("Please enter user's email")
@@ -246,38 +460,216 @@ def add_user(ctx):
     if not click.confirm(f'Add more users in this Veracode account?'):
       break
   click.echo('Adding users to Veracode Platform...')
-  add_users_to_platform(user_list, config, setting_dict)
+  add_users_to_platform(user_list, client, concurrency)
 
 
 @users.command('delete')
 @click.pass_context
-def delete_user(ctx):
-  """Update Veracode Users"""
-  """Delete a Veracode Application"""
-  config = ctx.obj['config']
-  setting_dict = ctx.obj['setting']
+@click.option('-e', '--email', 'emails', multiple=True,
+              help='Delete users whose email matches this glob (repeatable)')
+@click.option('--id', 'user_ids', multiple=True,
+              help='Delete the user with this user id (repeatable)')
+@click.option('--all', 'select_all', is_flag=True,
+              help='Delete every user except the API account itself')
+@click.option('-y', '--yes', is_flag=True,
+              help='Do not ask for confirmation')
+@click.option('-c', '--concurrency', type=click.IntRange(min=1),
+              help='Number of users to delete in parallel')
+@click.option('--refresh', is_flag=True,
+              help='Ignore the local listing cache')
+@click.option('--dry-run', is_flag=True,
+              help='Count the API calls per endpoint and estimate how long '
+                   'they take, then exit without deleting anything')
+def delete_user(ctx, emails, user_ids, select_all, yes, concurrency, refresh,
+                dry_run):
+  """Delete Veracode Users
+
+  Without --email, --id or --all, users are picked interactively: type to
+  search, Tab to select, Enter to delete the selection.
+  """
+  client = activated_client(ctx)
+
+  user_list = list(fetch_users(client, refresh=refresh))
+
+  if emails or user_ids or select_all:
+    selected = select_users(user_list, emails, user_ids, select_all,
+                            exclude_user_id=fetch_self_user_id(client))
+    missing = set(user_ids) - {user.user_id for user in selected}
+    if missing:
+      click.secho(f'User not found: {", ".join(sorted(missing))}',
+                  fg='yellow')
+  elif sys.stdin.isatty():
+    self_user_id = fetch_self_user_id(client)
+    selected = Picker([user for user in user_list
+                       if user.user_id != self_user_id],
+                      lambda user: user.email, format_user,
+                      users_headers()).run()
+  elif dry_run:
+    click.secho('--dry-run needs --email, --id or --all when the input is '
+                'not a terminal.', fg='red')
+    sys.exit(1)
+  else:
+    delete_users_by_id(user_list, client)
+    return
+
+  if not selected:
+    click.secho('No users to delete.', fg='yellow')
+    return
+  print_users_headers()
+  print_users(selected)
+  if dry_run:
+    call_plan = CallPlan()
+    call_plan.add_listing(client.admin_url('/users'), len(user_list),
+                          client.page_size)
+    call_plan.add_read(client.admin_url('/users/self'))
+    call_plan.add_requests(selected,
+                           lambda user: delete_user_request(client, user))
+    print_call_plan(call_plan, client, concurrency)
+    return
+  if not yes and not click.confirm(
+          f'Delete these {len(selected)} users, continue?'):
+    sys.exit(0)
+  result = delete_users(selected, client, concurrency)
+  if result.failed:
+    sys.exit(1)
 
-  user_list = fetch_users(setting_dict, config)
 
-  while True:
-    print_users_headers()
-    print_users(user_list)
-    user_id = click.prompt(
-      "Enter user id (i.e. 3) to delete or \"-1\" to quit", type=int)
-    if user_id == -1:
-      sys.exit(0)
-    if user_id < 1 or user_id > len(user_list):
-      click.secho(f'{user_id} is not in range.', fg='red')
-    else:
-      user = user_list[user_id - 1]
-      result = delete_one_user(user, setting_dict, config)
-      if result == 'fail':
-        sys.exit(1)
-      else:
-        del user_list[user_id - 1]
+USER_TEMPLATE = PayloadTemplate(
+  USER_CREATION_INPUT, {field: (field,) for field in
+                        ('first_name', 'last_name', 'email_address',
+                         'user_name')})
+
+
+@users.command('update')
+@click.pass_context
+@click.option('-e', '--email', 'emails', multiple=True,
+              help='Update users whose email matches this glob (repeatable)')
+@click.option('--id', 'user_ids', multiple=True,
+              help='Update the user with this user id (repeatable)')
+@click.option('-f', '--users-file',
+              type=click.Path(exists=True, dir_okay=False),
+              help='Update the users of a user sheet (.xlsx second sheet, '
+                   '.csv, .jsonl or .json)')
+@click.option('--all', 'select_all', is_flag=True,
+              help='Update every user except the API account itself')
+@click.option('--role', 'roles', multiple=True,
+              help='Give exactly these roles (repeatable)')
+@click.option('--add-role', 'add_roles', multiple=True,
+              help='Add this role (repeatable)')
+@click.option('--remove-role', 'remove_roles', multiple=True,
+              help='Remove this role (repeatable)')
+@click.option('--team', 'teams', multiple=True,
+              help='Put users in exactly these teams, by name (repeatable)')
+@click.option('--add-team', 'add_teams', multiple=True,
+              help='Add users to this team (repeatable)')
+@click.option('--remove-team', 'remove_teams', multiple=True,
+              help='Remove users from this team (repeatable)')
+@click.option('--enable/--disable', 'active', default=None,
+              help='Enable or disable login')
+@click.option('-y', '--yes', is_flag=True,
+              help='Do not ask for confirmation')
+@click.option('-c', '--concurrency', type=click.IntRange(min=1),
+              help='Number of users to update in parallel')
+@click.option('--refresh', is_flag=True,
+              help='Ignore the local listing cache')
+def update_users(ctx, emails, user_ids, users_file, select_all, roles,
+                 add_roles, remove_roles, teams, add_teams, remove_teams,
+                 active, yes, concurrency, refresh):
+  """Update Roles, Teams and Login of Existing Users
+
+  Current roles, teams and login state come from one detailed listing.
+  Users that already match are skipped; the others get concurrent partial
+  updates carrying only the fields that change.
+  """
+  if not (emails or user_ids or users_file or select_all):
+    raise click.UsageError(
+      'Select users with --email, --id, --users-file or --all.')
+  if not (roles or add_roles or remove_roles or teams or add_teams
+          or remove_teams or active is not None):
+    raise click.UsageError('Nothing to change: pass roles, teams, '
+                           '--enable or --disable.')
+  file_emails = set()
+  if users_file:
+    # imported on demand: the inventory module imports this one
+    from inventory import iter_users
+    file_emails = {user.email.lower() for user in iter_users(users_file)}
+  client = activated_client(ctx)
+
+  try:
+    team_ids = fetch_team_ids(client, teams + add_teams + remove_teams) \
+      if teams or add_teams or remove_teams else {}
+    details = {record['user_id']: record for record in status_until_first(
+      client.iter_listing(client.admin_url('/users'), 'users',
+                          params={'detailed': 'true'}, refresh=refresh),
+      client.stats, 'Fetching users')}
+  except requests.RequestException as e:
+    click.echo("Whoops!")
+    click.echo(e)
+    sys.exit(1)
+  except ApiError as e:
+    click.secho(str(e), fg='red')
+    sys.exit(1)
+  update = UserUpdate(roles, add_roles, remove_roles,
+                      [team_ids[name] for name in teams],
+                      [team_ids[name] for name in add_teams],
+                      [team_ids[name] for name in remove_teams], active)
+
+  user_list = [User.from_detailed(record) for record in details.values()]
+  self_user_id = fetch_self_user_id(client)
+  selected = select_users(user_list, emails, user_ids, select_all,
+                          exclude_user_id=self_user_id)
+  selected_ids = {user.user_id for user in selected}
+  selected.extend(user for user in user_list
+                  if user.email.lower() in file_emails
+                  and user.user_id not in selected_ids
+                  and user.user_id != self_user_id)
+  missing = (set(user_ids) - {user.user_id for user in selected}) | \
+            (file_emails - {user.email.lower() for user in selected})
+  if missing:
+    click.secho(f'User not found: {", ".join(sorted(missing))}',
+                fg='yellow')
+
+  updates = []
+  for user in selected:
+    body = update.body_for(details[user.user_id])
+    if body is not None:
+      updates.append((user, body))
+  unchanged = len(selected) - len(updates)
+  if unchanged:
+    click.secho(f'Skipping {unchanged} users that already match.',
+                fg='yellow')
+  if not updates:
+    click.secho('No users to update.', fg='yellow')
+    return
+  print_users_headers()
+  print_users(user for user, _ in updates)
+  if not yes and not click.confirm(
+          f'Update these {len(updates)} users, continue?'):
+    sys.exit(0)
+
+  def label(update_item):
+    return update_item[0].email
+
+  result = run_bulk(client, updates,
+                    lambda update_item: update_user_request(client,
+                                                            *update_item),
+                    label=label,
+                    progress_label='Updating user',
+                    concurrency=concurrency)
+  print_bulk_summary(result, label, 'users', 'updated')
+  client.update_cache('users', 'user_id',
+                      upserts=[response.json()
+                               for _, response in result.succeeded])
+  if result.failed:
+    sys.exit(1)
 
 
 class User:
+  FIELDS = ('user_id', 'email', 'first_name', 'last_name', 'enabled', 'saml',
+            'last_login')
+  __slots__ = ('first_name', 'last_name', 'email', 'username', 'user_id',
+               'saml', 'enabled', 'last_login')
+
   def __init__(self, first_name, last_name, email, username, user_id=None,
                saml=None, enabled=None, last_login=None):
     self.first_name = first_name
@@ -286,16 +678,40 @@ class User:
     self.username = username
     self.user_id = '' if not user_id else user_id
     self.saml = False if not saml else saml
-    self.enabled = True if not enabled else enabled
+    self.enabled = True if enabled is None else enabled
     self.last_login = None if not last_login else last_login
 
+  @classmethod
+  def from_api(cls, data):
+    return cls('', '', data['email_address'], data['email_address'],
+               data['user_id'], data.get('saml_user'),
+               data.get('login_enabled'))
+
+  @classmethod
+  def from_detailed(cls, data):
+    user = cls.from_api(data)
+    user.update_details(data)
+    return user
+
+  def update_details(self, data):
+    self.first_name = data.get('first_name') or ''
+    self.last_name = data.get('last_name') or ''
+    self.last_login = data.get('last_login')
+
+  def to_dict(self):
+    return {'user_id': self.user_id,
+            'email': self.email,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'enabled': self.enabled,
+            'saml': self.saml,
+            'last_login': self.last_login}
+
   def get_user_json(self):
-    user_dict = copy.deepcopy(USER_CREATION_INPUT)
-    user_dict['first_name'] = self.first_name
-    user_dict['last_name'] = self.last_name
-    user_dict['email_address'] = self.email
-    user_dict['user_name'] = self.username
-    return json.dumps(user_dict)
+    return USER_TEMPLATE.render(first_name=self.first_name,
+                                last_name=self.last_name,
+                                email_address=self.email,
+                                user_name=self.username)
 
   def __str__(self) -> str:
     return f'First Name {self.first_name}, Last Name {self.last_name}, ' \
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: Vincent Deng
+# @Time: 24/10/2026 9:10 am
+# @Organisation: Veracode
+"""Listing cache and page revalidation, against the local mock API."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from api_client import VeracodeApiClient, _next_page  # noqa: E402
+from cache import ListingCache  # noqa: E402
+from mock_api import MockVeracodeApi  # noqa: E402
+
+# syntactically valid, never checked by the mock server
+MOCK_API_KEY_ID = '0' * 32
+MOCK_API_KEY_SECRET = '0' * 128
+PAGE_SIZE = 10
+
+
+@pytest.fixture
+def server():
+  server = MockVeracodeApi(applications=5, users=35).start()
+  yield server
+  server.shutdown()
+
+
+@pytest.fixture
+def client(server, tmp_path):
+  client = VeracodeApiClient(MOCK_API_KEY_ID, MOCK_API_KEY_SECRET,
+                             dict(server.settings(), rate_limit=1000),
+                             profile='test')
+  client.cache.directory = tmp_path
+  statuses = []
+  request = client.request
+
+  def recording_request(method, url, **kwargs):
+    response = request(method, url, **kwargs)
+    statuses.append(response.status_code)
+    return response
+
+  client.request = recording_request
+  client.statuses = statuses
+  yield client
+  client.close()
+
+
+def list_users(client, params=None, revalidate=False):
+  return list(client.iter_listing(client.admin_url('/users'), 'users',
+                                  params=params, page_size=PAGE_SIZE,
+                                  revalidate=revalidate))
+
+
+def test_unchanged_listing_is_revalidated_page_by_page(client):
+  first = list_users(client)
+  assert client.statuses == [200] * 4
+
+  del client.statuses[:]
+  assert list_users(client, revalidate=True) == first
+  assert client.statuses == [304] * 4
+
+
+def test_revalidation_resumes_at_the_first_changed_page(client, server):
+  first = list_users(client)
+  changed = first[25]  # third page
+  server.dataset.users[changed['user_id']]['login_enabled'] = False
+
+  del client.statuses[:]
+  second = list_users(client, revalidate=True)
+  assert client.statuses == [304, 304, 200, 200]
+  assert len(second) == len(first)
+  assert [user['user_id'] for user in second] == \
+         [user['user_id'] for user in first]
+  assert second[25]['login_enabled'] is False
+
+  # the resumed crawl replaced the entry, validators included
+  del client.statuses[:]
+  assert list_users(client, revalidate=True) == second
+  assert client.statuses == [304] * 4
+
+
+def test_fresh_entry_is_served_without_requests(client):
+  first = list_users(client)
+  del client.statuses[:]
+  assert list_users(client) == first
+  assert client.statuses == []
+
+
+def test_apply_replaces_upserts_in_unfiltered_entries(tmp_path):
+  cache = ListingCache('test', ttl=300)
+  cache.directory = tmp_path
+  cache.store('users', [{'user_id': '1', 'name': 'a'},
+                        {'user_id': '2', 'name': 'b'}],
+              pages=[{'url': 'u', 'params': None, 'etag': 'e',
+                      'last_modified': None, 'count': 2}])
+  cache.apply('users', 'user_id',
+              upserts=[{'user_id': '1', 'name': 'A'},
+                       {'user_id': '3', 'name': 'c'}],
+              removals=['2'])
+
+  entry = cache.load('users')
+  assert entry['records'] == [{'user_id': '1', 'name': 'A'},
+                              {'user_id': '3', 'name': 'c'}]
+  assert entry['pages'] == []
+  assert cache.is_fresh(entry)
+
+
+def test_apply_marks_filtered_entries_stale_on_upsert(tmp_path):
+  cache = ListingCache('test', ttl=300)
+  cache.directory = tmp_path
+  key = cache.key('users', {'login_enabled': 'true'})
+  cache.store(key, [{'user_id': '1'}, {'user_id': '2'}],
+              params={'login_enabled': 'true'})
+
+  cache.apply('users', 'user_id', removals=['2'])
+  entry = cache.load(key)
+  assert entry['records'] == [{'user_id': '1'}]
+  assert cache.is_fresh(entry)
+
+  cache.apply('users', 'user_id',
+              upserts=[{'user_id': '1', 'login_enabled': False},
+                       {'user_id': '3', 'login_enabled': True}])
+  entry = cache.load(key)
+  assert [record['user_id'] for record in entry['records']] == ['1']
+  assert not cache.is_fresh(entry)
+
+
+def test_filtered_listing_drops_a_record_that_stopped_matching(client,
+                                                               server):
+  url = client.admin_url('/users/search')
+  params = {'login_enabled': 'true'}
+  enabled = list(client.iter_listing(url, 'users', params=params,
+                                     page_size=PAGE_SIZE))
+  disabled = dict(enabled[0], login_enabled=False)
+  server.dataset.users[disabled['user_id']]['login_enabled'] = False
+  client.update_cache('users', 'user_id', upserts=[disabled])
+
+  again = list(client.iter_listing(url, 'users', params=params,
+                                   page_size=PAGE_SIZE))
+  assert disabled['user_id'] not in {user['user_id'] for user in again}
+  assert len(again) == len(enabled) - 1
+
+
+def test_next_page_follows_links_then_page_metadata():
+  url = 'https://api.example.com/users'
+  linked = {'_links': {'next': {'href': url + '?page=1&size=10'}},
+            'page': {'number': 0, 'total_pages': 3}}
+  assert _next_page(linked, url, {'size': 10}) == \
+         (url + '?page=1&size=10', None)
+
+  unlinked = {'page': {'number': 0, 'total_pages': 3}}
+  assert _next_page(unlinked, url, {'size': 10}) == \
+         (url, {'size': 10, 'page': 1})
+
+  last = {'page': {'number': 2, 'total_pages': 3}}
+  assert _next_page(last, url, {'size': 10, 'page': 2}) is None
+  assert _next_page({}, url, None) is None